@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: 50 assets x 40 currencies through the per-coin dict loop
+convert_crypto_prices used to run vs. ConversionEngine (float / fixed / decimal).
+
+    python benchmarks/bench_conversion.py [--assets N] [--currencies M] [--repeat R]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.converter_service import ConversionEngine
+
+
+def loop_convert(binance_data: dict, xe_data: dict) -> dict:
+    """The pre-engine implementation, kept here as the baseline."""
+    rates = xe_data.get("rates", {})
+    results = {}
+    for coin, coin_data in binance_data.items():
+        usd_price = float(coin_data["price"])
+        results[coin] = {currency: round(usd_price * rate, 2) for currency, rate in rates.items()}
+    return results
+
+
+def make_inputs(n_assets: int, n_currencies: int, decimals: int = None):
+    """Random prices (8 decimals) and rates; `decimals` rounds both, which makes half-cent ties common."""
+    rng = random.Random(42)
+    binance_data = {
+        f"C{i}": {"symbol": f"C{i}USDT", "price": f"{rng.uniform(0.01, 120000):.{decimals or 8}f}"} for i in range(n_assets)
+    }
+    xe_data = {"rates": {f"F{j:02d}": rng.uniform(0.5, 400) for j in range(n_currencies)}}
+    if decimals is not None:
+        xe_data["rates"] = {currency: round(rate, decimals) for currency, rate in xe_data["rates"].items()}
+    return binance_data, xe_data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=50)
+    parser.add_argument("--currencies", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    binance_data, xe_data = make_inputs(args.assets, args.currencies)
+    baseline = loop_convert(binance_data, xe_data)
+
+    cases = {
+        "dict loop": lambda: loop_convert(binance_data, xe_data),
+        "engine float (matrix)": lambda: ConversionEngine(binance_data, xe_data).matrix,
+        "engine float (as_dict)": lambda: ConversionEngine(binance_data, xe_data).as_dict(),
+        "engine fixed (matrix)": lambda: ConversionEngine(binance_data, xe_data, "fixed").matrix,
+        "engine decimal (matrix)": lambda: ConversionEngine(binance_data, xe_data, "decimal").matrix,
+    }
+
+    print(f"{args.assets} assets x {args.currencies} currencies, best of 5 x {args.repeat}")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.repeat, repeat=5)) / args.repeat
+        print(f"{name:<26} {best * 1e6:10.1f} us")
+
+    mismatches = sum(
+        baseline[coin][cur] != value
+        for coin, row in ConversionEngine(binance_data, xe_data).as_dict().items()
+        for cur, value in row.items()
+    )
+    print(f"float engine vs dict loop mismatches: {mismatches}")
+
+    tie_data, tie_xe = make_inputs(400, 500, decimals=2)
+    tie_baseline = loop_convert(tie_data, tie_xe)
+    mismatches = sum(
+        tie_baseline[coin][cur] != value
+        for coin, row in ConversionEngine(tie_data, tie_xe).as_dict().items()
+        for cur, value in row.items()
+    )
+    print(f"float engine vs dict loop mismatches (200k cells, 2-decimal inputs): {mismatches}")
+
+    fixed = ConversionEngine(binance_data, xe_data, "fixed").as_dict()
+    decimal = ConversionEngine(binance_data, xe_data, "decimal").as_dict()
+    mismatches = sum(fixed[coin][cur] != value for coin, row in decimal.items() for cur, value in row.items())
+    print(f"fixed engine vs decimal engine mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
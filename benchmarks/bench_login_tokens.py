@@ -0,0 +1,70 @@
+"""
+Benchmark randomCode extraction from BO login pages: full BeautifulSoup tree
+(html.parser, and lxml when installed) vs. the targeted scanner in
+utils/html_inputs.py.
+
+    python benchmarks/bench_login_tokens.py [PAGE.html ...]
+
+Without arguments it uses the login pages saved by a run with
+BO_SAVE_LOGIN_PAGES=1 (.cache/bo_login_pages/*.html). If there are none, it
+falls back to the checked-in deposit_page.html (a real BO page) with a
+hidden randomCode input added before </body>.
+"""
+import glob
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from utils.env_loader import get_cache_path
+from utils.html_inputs import _scan_input, extract_input_value
+
+try:
+    import lxml  # noqa: F401
+    PARSERS = ["html.parser", "lxml"]
+except ImportError:
+    PARSERS = ["html.parser"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_pages(paths: list) -> dict:
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(os.path.dirname(get_cache_path("x")), "bo_login_pages", "*.html")))
+    if paths:
+        pages = {}
+        for path in paths:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                pages[os.path.basename(path)] = f.read()
+        return pages
+
+    with open(os.path.join(ROOT, "deposit_page.html"), "r", encoding="utf-8") as f:
+        page = f.read()
+    token = '<input type="hidden" id="randomCode" name="randomCode" value="8f3a1c"/>'
+    return {"deposit_page.html (+randomCode)": page.replace("</body>", f"{token}\n</body>", 1)}
+
+
+def soup_extract(page: str, parser: str):
+    tag = BeautifulSoup(page, parser).find("input", {"id": "randomCode"})
+    return tag["value"] if tag is not None else None
+
+
+def main():
+    pages = load_pages(sys.argv[1:])
+    for name, page in pages.items():
+        expected = soup_extract(page, "html.parser")
+        assert extract_input_value(page, "randomCode") == expected, f"{name}: scanner disagrees with BeautifulSoup"
+
+        print(f"{name}  ({len(page) / 1024:.0f} KiB, randomCode={expected})")
+        cases = {f"BeautifulSoup {parser}": (lambda p=parser: soup_extract(page, p)) for parser in PARSERS}
+        cases["targeted scanner"] = lambda: _scan_input(page, "randomCode")
+        for label, fn in cases.items():
+            number = 20 if label.startswith("Beautiful") else 2000
+            best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+            print(f"  {label:<26} {best * 1e6:12.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare the Playwright path and the browser-free replay path of
+BinanceP2PService: per-fiat latency and resident memory.
+
+    python benchmarks/bench_p2p_replay.py [FIAT ...]
+
+Hits the live Binance P2P endpoint. The replay path is seeded with the
+p2p.py payload template, so it only launches a browser if Binance rejects it.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.binance_p2p_service import BinanceP2PService
+from services.p2p_replay_client import P2P_SEARCH_URL, P2P_PAYLOAD_TEMPLATE, CapturedRequestStore
+from services.xe_service import XE_CURRENCIES
+from utils.env_loader import get_cache_path
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SEED_HEADERS = {
+    "content-type": "application/json",
+    "accept": "*/*",
+    "user-agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
+    ),
+}
+
+
+def rss_mb() -> float | None:
+    """RSS of this process plus its children (Chromium), in MB."""
+    if psutil is None:
+        return None
+    proc = psutil.Process()
+    total = proc.memory_info().rss
+    for child in proc.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+async def run_mode(mode: str, fiats: list) -> list:
+    service = BinanceP2PService(fetch_mode=mode)
+    if mode == "replay":
+        service.capture_store = CapturedRequestStore(path=get_cache_path("p2p_capture_bench.json"))
+        service.capture_store.save({
+            "url": P2P_SEARCH_URL,
+            "headers": SEED_HEADERS,
+            "cookies": {},
+            "post_data": P2P_PAYLOAD_TEMPLATE,
+        })
+
+    await service.start()
+    rows = []
+    try:
+        for fiat in fiats:
+            started = time.perf_counter()
+            try:
+                pages = await service._fetch_all_pages_async(fiat, max_pages=3)
+                status = f"{sum(len(p.get('data') or []) for p in pages)} ads"
+            except Exception as e:
+                status = f"error: {e}"
+            elapsed = time.perf_counter() - started
+            rows.append((mode, fiat, elapsed, rss_mb(), status))
+    finally:
+        await service.close()
+    return rows
+
+
+def print_rows(rows: list):
+    print(f"{'mode':<8} {'fiat':<5} {'latency (s)':>12} {'rss (MB)':>10}  result")
+    for mode, fiat, elapsed, rss, status in rows:
+        rss_text = f"{rss:10.1f}" if rss is not None else f"{'n/a':>10}"
+        print(f"{mode:<8} {fiat:<5} {elapsed:12.3f} {rss_text}  {status}")
+
+
+async def main():
+    fiats = sys.argv[1:] or XE_CURRENCIES
+    rows = []
+    for mode in ("browser", "replay"):
+        rows += await run_mode(mode, fiats)
+    print_rows(rows)
+    if psutil is None:
+        print("\n(install psutil to report RSS)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
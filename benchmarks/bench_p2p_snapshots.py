@@ -0,0 +1,67 @@
+"""
+Offline P2P benchmark: load, parse, filter and top-5 aggregate every saved
+binance_{FIAT}_pages_<timestamp>.json snapshot through BinanceP2PService
+with the snapshot backend. No browser or network involved.
+
+    python benchmarks/bench_p2p_snapshots.py [--dir DIR] [--repeat N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.binance_p2p_service import BinanceP2PService
+from services.p2p_snapshot_backend import SnapshotBackend
+from utils.p2p_snapshots import list_snapshots, load_snapshot_pages
+
+
+async def run(directory: str, repeat: int):
+    snapshots = list_snapshots(directory)
+    if not snapshots:
+        sys.exit(f"No binance_*_pages_*.json snapshots in {directory}")
+
+    ads_per_snapshot = {
+        path: sum(len(page.get("data") or []) for page in load_snapshot_pages(path))
+        for _, _, path in snapshots
+    }
+
+    latencies = defaultdict(list)
+    total_ads = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    for _ in range(repeat):
+        for fiat, taken_at, path in snapshots:
+            service = BinanceP2PService(backend=SnapshotBackend(directory, as_of=taken_at))
+            t0 = time.perf_counter()
+            result = await service._fetch_top5_async(fiat, max_retries=1)
+            latencies[fiat].append(time.perf_counter() - t0)
+            if result["status"] != "success":
+                print(f"{os.path.basename(path)}: {result.get('message')}")
+            total_ads += ads_per_snapshot[path]
+
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"snapshots: {len(snapshots)} x {repeat}   ads: {total_ads}")
+    print(f"throughput: {total_ads / elapsed:,.0f} ads/s   total: {elapsed:.3f}s   peak memory: {peak / 1024:,.0f} KiB")
+    print(f"{'fiat':<5} {'runs':>5} {'mean (ms)':>10} {'min (ms)':>10} {'max (ms)':>10}")
+    for fiat, values in sorted(latencies.items()):
+        print(
+            f"{fiat:<5} {len(values):>5} {1000 * sum(values) / len(values):10.2f} "
+            f"{1000 * min(values):10.2f} {1000 * max(values):10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=".", help="folder holding the snapshot files")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over all snapshots")
+    args = parser.parse_args()
+    asyncio.run(run(args.dir, args.repeat))
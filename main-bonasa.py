@@ -3,7 +3,7 @@ import random
 from datetime import datetime
 from services.bonasa_service import BonasaService
 from utils.logger import Logger
-from utils.spreadsheet import read_and_calculate_bonasa_sheet_tab, save_effective_conversion
+from utils.spreadsheet import read_and_calculate_bonasa_sheet_tab, save_effective_conversion, mark_bonasa_source_processed
 
 async def retry_async(func, *args, retries=5, min_wait=1, max_wait=5, logger=None, **kwargs):
     """
@@ -33,9 +33,10 @@ async def main():
         rows = read_and_calculate_bonasa_sheet_tab(logger)
         if rows:
             print(rows)
-            save_effective_conversion(logger, rows)
+            if save_effective_conversion(logger, rows):
+                mark_bonasa_source_processed()
         else:
-            logger.warning("⚠️ No rows to process")
+            logger.warn("⚠️ No rows to process")
     else:
         logger.error()
     
@@ -1,13 +1,14 @@
 import asyncio
 import random
 from datetime import datetime
-from services.binance_service import get_btc_eth_prices, get_usdt_to_usd
+from services.binance_service import get_spot_and_usdt_prices, close_client
 from services.bonasa_service import BonasaService
-from services.xe_service import fetch_xe_rates
+from services.xe_service import fetch_xe_rates_cached, wait_for_xe_refresh, XE_CURRENCIES
 from services.converter_service import convert_crypto_prices
 from services.bo_scrapper_service import BOScrapperService
 from services.binance_p2p_service import BinanceP2PService
 from utils.logger import Logger
+from utils.env_loader import get_env
 from utils.spreadsheet import read_and_calculate_bonasa_sheet_tab, save_effective_conversion
 
 async def retry_async(func, *args, retries=5, min_wait=1, max_wait=5, logger=None, **kwargs):
@@ -45,22 +46,43 @@ async def main():
     # else:
     #     logger.error()
 
-    #get usdt to usd price
-    binance_usdtusd = await retry_async(get_usdt_to_usd, retries=5, min_wait=2, max_wait=5, logger=logger)
-    
-    # Task 1: Binance (BTC/ETH) with retries
-    binance_data = await retry_async(get_btc_eth_prices, retries=5, min_wait=2, max_wait=5, logger=logger)
+    # P2P USDT rates for every fiat run in the background while the
+    # spot, XE and BO stages do their own I/O
+    p2p_service = BinanceP2PService()
+    await p2p_service.start()
+    p2p_task = asyncio.create_task(p2p_service.fetch_top5_for_fiats_async(XE_CURRENCIES))
+    try:
+        await run_conversion(logger, p2p_service, p2p_task)
+    finally:
+        if not p2p_task.done():
+            p2p_task.cancel()
+        # let the cancelled fetch unwind before its browser pool / HTTP client close
+        await asyncio.gather(p2p_task, return_exceptions=True)
+        await p2p_service.close()
+        await close_client()
+        await wait_for_xe_refresh()
+    logger.info(f"→ P2P cache: {p2p_service.cache_stats()}")
+
+async def run_conversion(logger, p2p_service, p2p_task):
+    # get usdt to usd price + Task 1: Binance spot (BINANCE_ASSETS), one batched request with retries
+    spot_stage = await retry_async(get_spot_and_usdt_prices, retries=5, min_wait=2, max_wait=5, logger=logger)
+    binance_usdtusd, binance_data = spot_stage["data"]["usdt"], spot_stage["data"]["spot"]
     if binance_data.get("status") != "success":
         exit(f"→ Binance data fetch failed: {binance_data.get('error')}. Exiting.")
 
     logger.success(f"→ Binance data: {binance_data['data']}")
 
     # Task 2: XE conversion rates with retries
-    xe_data = await retry_async(fetch_xe_rates, retries=5, min_wait=2, max_wait=5, logger=logger)
+    # served from the local cache when possible, refreshed in the background when stale
+    xe_data = await retry_async(fetch_xe_rates_cached, retries=5, min_wait=2, max_wait=5, logger=logger)
     if xe_data.get("status") != "success":
         exit(f"→ XE rates fetch failed: {xe_data.get('error')}. Exiting.")
 
-    logger.success(f"→ XE rates: {xe_data['data'].get('rates', {})}")
+    if xe_data.get("stale"):
+        logger.warn(f"→ XE rates are STALE ({xe_data['age'] / 3600:.1f}h old, XE refresh failing?): {xe_data['data'].get('rates', {})}")
+    else:
+        xe_source = f"cached, {xe_data['age'] / 60:.0f} min old" if xe_data.get("cached") else "fresh"
+        logger.success(f"→ XE rates ({xe_source}): {xe_data['data'].get('rates', {})}")
 
     # Task 3: Conversion
     converted = convert_crypto_prices(
@@ -72,15 +94,29 @@ async def main():
 
     # Task 4: BO Scrapper
     service = BOScrapperService()
-    if not service.test_accessible(logger):
+    if not await service.test_accessible_async(logger):
         logger.warn("→ VPN REQUIRED TO ACCESS")
         exit("Check your VPN.")
 
-    p2p_service = BinanceP2PService()
-
     localtime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    scrapper_response = service.scrappe_bo(logger, binance_usdtusd, xe_data.get("data", {}), converted.items(), binance_data.get("data", {}), p2p_service, localtime)
+    # Task 5: wait for the P2P rates (the brands read them from the cache)
+    p2p_rates = await p2p_task
+    if p2p_rates.get("status") != "success":
+        logger.warn(f"→ P2P rates incomplete: {p2p_rates.get('error')}")
+    logger.success(f"→ P2P rates: { {fiat: r.get('binance_rate') for fiat, r in p2p_rates['data'].items()} }")
+
+    # Runs in worker threads so the event loop stays free to serve P2P lookups.
+    # Brands run one after another unless BO_WORKERS > 1 (0 = one thread per brand).
+    bo_args = (logger, binance_usdtusd, xe_data.get("data", {}), converted.items(), binance_data.get("data", {}), p2p_service, localtime)
+    bo_workers = int(get_env("BO_WORKERS", "1")) or len(service.bo_brand)
+    if bo_workers > 1:
+        bo_run = await asyncio.to_thread(service.scrappe_bo_concurrent, *bo_args, max_workers=bo_workers)
+        for brand in bo_run["brands"]:
+            logger.info(f"→ {brand['brand']}: {'OK' if brand['success'] else 'FAILED'} in {brand['seconds']}s")
+        scrapper_response = bo_run["success"]
+    else:
+        scrapper_response = await asyncio.to_thread(service.scrappe_bo, *bo_args)
     logger.info(f"→ isCompleted: {scrapper_response}")
     if scrapper_response:
         logger.success(f"→ {scrapper_response}")
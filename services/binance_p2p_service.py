@@ -3,133 +3,322 @@ import traceback
 from utils.env_loader import get_env
 from datetime import datetime
 import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-
-nest_asyncio.apply()  # <-- allow nested event loops
+import threading
+from utils.browser_pool import BrowserPool
+from utils.ttl_cache import SingleFlightCache
+from utils.p2p_parser import loads, parse_ads, top_ads as select_top_ads
+from utils.p2p_archive import P2PArchive
+from services.xe_service import XE_CURRENCIES
+from services.p2p_snapshot_backend import SnapshotBackend
+from services.p2p_replay_client import P2P_SEARCH_URL, CapturedRequestStore, P2PReplayClient, ReplayCaptureError
 
 class BinanceP2PService:
-    def __init__(self):
-        self.base_url = "https://p2p.binance.com/bapi/c2c/v2/friendly/c2c/adv/search"
+    def __init__(self, browser_pool: BrowserPool = None, fetch_mode: str = None, max_in_flight: int = None, backend=None):
+        self.base_url = P2P_SEARCH_URL
+        self.browser_pool = browser_pool or BrowserPool(
+            max_contexts=int(get_env("P2P_MAX_CONTEXTS", "2")),
+            max_uses=int(get_env("P2P_CONTEXT_MAX_USES", "20")),
+        )
+        # "browser": capture + replay inside Playwright on every fetch
+        # "replay":  capture once, persist it, replay through httpx
+        # "snapshot": serve saved binance_*_pages_*.json files (P2P_SNAPSHOT_DIR)
+        self.fetch_mode = fetch_mode or get_env("P2P_FETCH_MODE", "browser")
+        # Any object with `async fetch_pages(fiat, max_pages)` replaces the network fetch
+        self.backend = backend
+        if self.backend is None and self.fetch_mode == "snapshot":
+            self.backend = SnapshotBackend(get_env("P2P_SNAPSHOT_DIR", "."))
+        # how many result pages of one fiat may be requested at the same time
+        self.max_in_flight = max_in_flight or int(get_env("P2P_MAX_IN_FLIGHT", "3"))
+        # how many fiats may be fetched at the same time by fetch_top5_for_fiats
+        self.max_concurrent_fiats = int(get_env("P2P_MAX_CONCURRENT_FIATS", "4"))
+        self.capture_store = CapturedRequestStore()
+        self.replay_client = P2PReplayClient()
+        # one browser capture at a time, shared by every fiat (see _get_capture)
+        self._capture_lock = asyncio.Lock()
+        self.cache = SingleFlightCache(ttl_seconds=int(get_env("P2P_CACHE_TTL", "600")))
+        # raw page history, see utils/p2p_archive.py (P2P_ARCHIVE=0 turns it off)
+        self.archive = P2PArchive() if get_env("P2P_ARCHIVE", "1") == "1" else None
+        # event loop that owns the browser pool / http client (see _run_sync)
+        self._loop = None
+
+    async def start(self):
+        """
+        Launch the shared browser once, before the first fetch. The calling
+        loop becomes the one sync callers are dispatched to.
+        """
+        self._loop = asyncio.get_running_loop()
+        if self.backend is None and self.fetch_mode == "browser":
+            await self.browser_pool.start()
+
+    async def close(self):
+        """Shut down the shared browser and HTTP client and flush the archive. Call once at the end of the run."""
+        if self.backend is not None:
+            await self.backend.close()
+        await self.replay_client.close()
+        await self.browser_pool.close()
+        if self.archive is not None:
+            await asyncio.to_thread(self.archive.close)
+
+    async def _capture_search_request(self, context, page, fiat: str) -> dict:
+        """Open the P2P trade page and capture the search request the site sends."""
+        captured_request = {}
+
+        async def handle_request(request):
+            if "bapi/c2c/v2/friendly/c2c/adv/search" in request.url and request.method == "POST":
+                if not captured_request:
+                    captured_request["url"] = request.url
+                    captured_request["headers"] = dict(request.headers)
+                    try:
+                        captured_request["post_data"] = request.post_data_json
+                    except:
+                        captured_request["post_data"] = json.loads(request.post_data or "{}")
+
+        page.on("request", handle_request)
+        await page.goto(f"https://p2p.binance.com/en/trade/sell/USDT?fiat={fiat}&payment=all-payments")
+        await page.wait_for_load_state("networkidle")
+
+        if not captured_request:
+            raise RuntimeError("Could not capture the search request.")
+
+        captured_request["cookies"] = {
+            cookie["name"]: cookie["value"] for cookie in await context.cookies(captured_request["url"])
+        }
+        return captured_request
 
     async def _fetch_all_pages_async(self, fiat: str, max_pages: int = 3):
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
-            page = await context.new_page()
-
-            captured_request = {}
-
-            async def handle_request(request):
-                if "bapi/c2c/v2/friendly/c2c/adv/search" in request.url and request.method == "POST":
-                    if not captured_request:
-                        captured_request["url"] = request.url
-                        captured_request["headers"] = dict(request.headers)
-                        try:
-                            captured_request["post_data"] = request.post_data_json
-                        except:
-                            captured_request["post_data"] = json.loads(request.post_data or "{}")
-
-            page.on("request", handle_request)
-            await page.goto(f"https://p2p.binance.com/en/trade/sell/USDT?fiat={fiat}&payment=all-payments")
-            await page.wait_for_load_state("networkidle")
-
-            if not captured_request:
-                raise RuntimeError("Could not capture the search request.")
-
-            all_pages_raw = []
-            for page_number in range(1, max_pages + 1):
-                captured_request["post_data"]["page"] = page_number
+        if self.backend is not None:
+            return await self.backend.fetch_pages(fiat, max_pages)
+        if self.fetch_mode == "replay":
+            return await self._replay_all_pages_async(fiat, max_pages)
+
+        async with self.browser_pool.page() as (context, page):
+            captured_request = await self._capture_search_request(context, page, fiat)
+
+            async def fetch_page(page_number: int) -> dict:
                 response = await context.request.post(
                     captured_request["url"],
-                    data=json.dumps(captured_request["post_data"]),
+                    data=json.dumps({**captured_request["post_data"], "page": page_number}),
                     headers=captured_request["headers"]
                 )
-                all_pages_raw.append(await response.json())
-
-            await browser.close()
-            return all_pages_raw
-
-    def fetch_top5_completed_order_rates(self, fiat: str, max_retries: int = 3) -> dict:
-        """Sync wrapper for async Playwright fetch with retry logic and raw JSON save."""
+                return loads(await response.body())
+
+            return await self._gather_pages(fiat, fetch_page, max_pages)
+
+    async def _gather_pages(self, fiat: str, fetch_page, max_pages: int) -> list:
+        """
+        Fetch pages 1..max_pages concurrently, at most `max_in_flight` at a time.
+        Pages are returned in page order. A failed page is logged and dropped;
+        the fetch only fails if every page failed.
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def bounded_fetch(page_number: int):
+            async with semaphore:
+                return await fetch_page(page_number)
+
+        results = await asyncio.gather(
+            *(bounded_fetch(page_number) for page_number in range(1, max_pages + 1)),
+            return_exceptions=True,
+        )
+
+        all_pages_raw = []
+        errors = []
+        for page_number, result in enumerate(results, start=1):
+            if isinstance(result, BaseException):
+                # A rejected capture invalidates every page, let the caller recapture
+                if isinstance(result, ReplayCaptureError):
+                    raise result
+                errors.append(result)
+                print(f"{fiat} page {page_number} failed: {result!r}")
+            else:
+                all_pages_raw.append(result)
+
+        if not all_pages_raw and errors:
+            raise errors[0]
+        return all_pages_raw
+
+    async def _capture_with_browser(self, fiat: str) -> dict:
+        async with self.browser_pool.page() as (context, page):
+            captured_request = await self._capture_search_request(context, page, fiat)
+        return self.capture_store.save(captured_request)
+
+    async def _get_capture(self, fiat: str, rejected: dict = None) -> dict:
+        """
+        The persisted capture, or a fresh one from the browser. Runs under a
+        lock so concurrent fiats wait for a single capture instead of each
+        opening its own; `rejected` is dropped only if nobody replaced it yet.
+        """
+        async with self._capture_lock:
+            captured_request = self.capture_store.load()
+            if (
+                rejected is not None
+                and captured_request is not None
+                and captured_request.get("captured_at") == rejected.get("captured_at")
+            ):
+                self.capture_store.invalidate()
+                captured_request = None
+            if captured_request is None:
+                captured_request = await self._capture_with_browser(fiat)
+            return captured_request
+
+    async def _replay_all_pages_async(self, fiat: str, max_pages: int = 3):
+        """
+        Replay the persisted capture through httpx. The browser is only used
+        when there is no valid capture, or the endpoint rejects the one we have.
+        """
+        captured_request = await self._get_capture(fiat)
+
+        try:
+            return await self._replay_pages(captured_request, fiat, max_pages)
+        except ReplayCaptureError as e:
+            print(f"Captured P2P request rejected ({e}), capturing a fresh one...")
+            captured_request = await self._get_capture(fiat, rejected=captured_request)
+            return await self._replay_pages(captured_request, fiat, max_pages)
+
+    async def _replay_pages(self, captured_request: dict, fiat: str, max_pages: int):
+        async def fetch_page(page_number: int) -> dict:
+            return await self.replay_client.fetch_page(captured_request, fiat, page_number)
+
+        return await self._gather_pages(fiat, fetch_page, max_pages)
+
+    def _build_top5_result(self, fiat: str, all_pages_raw: list) -> dict:
+        """Filter the raw search pages and average the 5 ads with the most monthly orders."""
+        all_ads = []
+        for page_data in all_pages_raw:
+            # if "Bank Transfer" in ad.trade_methods: skip it
+            all_ads.extend(parse_ads(page_data))
+
+        top_ads = [ad.to_dict(fiat) for ad in select_top_ads(all_ads, 5)]
+
+        # Retry if top_ads is empty
+        # if not top_ads:
+        #     attempt += 1
+        #     wait_time = 2 ** (attempt - 1)  # exponential backoff: 1s, 2s, 4s
+        #     print(f"No top ads found, retrying in {wait_time}s (attempt {attempt}/{max_retries})...")
+        #     import time; time.sleep(wait_time)
+        #     continue
+
+        avg_rate = sum(ad["price"] for ad in top_ads) / len(top_ads)
+        return {
+            "status": "success",
+            "fiat": fiat,
+            "asset": "USDT",
+            "binance_rate": avg_rate,
+            "sign": "Positive" if avg_rate >= 0 else "Negative",
+            "top_ads": top_ads,
+        }
+
+    def _error_result(self, fiat: str, message: str) -> dict:
+        return {
+            "status": "error",
+            "fiat": fiat,
+            "asset": "USDT",
+            "binance_rate": None,
+            "sign": None,
+            "top_ads": [],
+            "message": message,
+        }
+
+    async def _fetch_top5_async(self, fiat: str, max_retries: int = 3) -> dict:
+        """Async fetch + parse for one fiat, retrying with non-blocking backoff."""
         attempt = 0
-        while attempt < max_retries:
+        while True:
             try:
-                # Safe sync call even if already inside an event loop
-                loop = asyncio.get_event_loop()
-                all_pages_raw = loop.run_until_complete(self._fetch_all_pages_async(fiat, max_pages=3))
-
-                all_ads = []
-                for page_data in all_pages_raw:
-                    data = page_data.get("data", [])
-                    for entry in data:
-                        adv = entry.get("adv", {})
-                        advertiser = entry.get("advertiser", {})
-                        trade_methods = adv.get("tradeMethods", [])
-                        featured_ad = entry.get("privilegeDesc", None)
-                        trade_method_names = [method.get("tradeMethodName") for method in trade_methods]
-
-                        if featured_ad not in (None, ""):
-                            continue
-
-                        # if "Bank Transfer" in trade_method_names:
-                        #     continue
-
-                        all_ads.append({
-                            "price": float(adv.get("price")),
-                            "asset": adv.get("asset"),
-                            "fiat": fiat,
-                            "minAmount": adv.get("minSingleTransAmount"),
-                            "maxAmount": adv.get("dynamicMaxSingleTransAmount"),
-                            "available": adv.get("surplusAmount"),
-                            "tradeType": "SELL",
-                            "nick": advertiser.get("nickName"),
-                            "completionRate": advertiser.get("monthFinishRate"),
-                            "orders": advertiser.get("monthOrderCount", 0),
-                            "tradeMethods": trade_method_names,
-                        })
-
-                # Save all raw pages (commented, you can uncomment if needed)
-                # timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                # with open(f"binance_{fiat}_pages_{timestamp}.json", "w", encoding="utf-8") as f:
-                #     json.dump({"pages": all_pages_raw}, f, indent=4, ensure_ascii=False)
-
-                top_ads = sorted(all_ads, key=lambda x: x["orders"], reverse=True)[:5]
-
-                # Retry if top_ads is empty
-                # if not top_ads:
-                #     attempt += 1
-                #     wait_time = 2 ** (attempt - 1)  # exponential backoff: 1s, 2s, 4s
-                #     print(f"No top ads found, retrying in {wait_time}s (attempt {attempt}/{max_retries})...")
-                #     import time; time.sleep(wait_time)
-                #     continue
-
-                avg_rate = sum(ad["price"] for ad in top_ads) / len(top_ads)
-                return {
-                    "status": "success",
-                    "fiat": fiat,
-                    "asset": "USDT",
-                    "binance_rate": avg_rate,
-                    "sign": "Positive" if avg_rate >= 0 else "Negative",
-                    "top_ads": top_ads,
-                }
-
+                all_pages_raw = await self._fetch_all_pages_async(fiat, max_pages=3)
+                # Raw pages go to the compressed archive in the background (not for replayed snapshots)
+                if self.archive is not None and self.backend is None:
+                    self.archive.submit(fiat, all_pages_raw)
+                return self._build_top5_result(fiat, all_pages_raw)
             except Exception:
                 attempt += 1
-                wait_time = 2 ** (attempt - 1)
-                print(f"Attempt {attempt} failed, retrying in {wait_time}s...")
-                import time; time.sleep(wait_time)
                 if attempt >= max_retries:
-                    # Return minimal info without breaking automation
-                    return {
-                        "status": "error",
-                        "fiat": fiat,
-                        "asset": "USDT",
-                        "binance_rate": None,
-                        "sign": None,
-                        "top_ads": [],
-                        "message": f"Failed after {attempt} attempts:\n{traceback.format_exc()}",
-                    }
+                    return self._error_result(fiat, f"Failed after {attempt} attempts:\n{traceback.format_exc()}")
+                wait_time = 2 ** (attempt - 1)
+                print(f"{fiat}: attempt {attempt} failed, retrying in {wait_time}s...")
+                await asyncio.sleep(wait_time)
+
+    async def fetch_top5_for_fiats_async(self, fiats: list = None, concurrency: int = None, max_retries: int = 3) -> dict:
+        """
+        Fetch the top-5 P2P rate for several fiats at once over the shared browser/session.
+        At most `concurrency` (P2P_MAX_CONCURRENT_FIATS) fiats are fetched at the same time.
+        Returns:
+            - status: "success" (all fiats), "partial" (some) or "error" (none)
+            - data: {fiat: result of fetch_top5_completed_order_rates}
+            - error: joined error messages, or None
+        """
+        fiats = [fiat.strip().upper() for fiat in (fiats or XE_CURRENCIES) if fiat.strip()]
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrent_fiats)
+
+        async def fetch_one(fiat: str) -> dict:
+            async with semaphore:
+                return await self.fetch_top5_completed_order_rates_async(fiat, max_retries)
+
+        results = await asyncio.gather(*(fetch_one(fiat) for fiat in fiats), return_exceptions=True)
+
+        data = {}
+        errors = []
+        for fiat, result in zip(fiats, results):
+            if isinstance(result, BaseException):
+                result = self._error_result(fiat, repr(result))
+            data[fiat] = result
+            if result.get("status") != "success":
+                errors.append(f"{fiat}: {result.get('message')}")
+
+        if not errors:
+            status = "success"
+        elif len(errors) < len(fiats):
+            status = "partial"
+        else:
+            status = "error"
+        return {"status": status, "data": data, "error": "; ".join(errors) or None}
+
+    def fetch_top5_for_fiats(self, fiats: list = None, concurrency: int = None, max_retries: int = 3) -> dict:
+        """Sync shim for fetch_top5_for_fiats_async."""
+        return self._run_sync(self.fetch_top5_for_fiats_async(fiats, concurrency, max_retries))
+
+    def _cache_key(self, fiat: str, max_pages: int = 3) -> tuple:
+        """(asset, fiat, tradeType, filters) - everything that changes the top ads."""
+        return ("USDT", fiat.upper(), "SELL", ("exclude_featured", max_pages))
+
+    def cache_stats(self) -> dict:
+        """Hit/miss/coalesced counters of the top-ads cache."""
+        return self.cache.stats()
+
+    async def fetch_top5_completed_order_rates_async(self, fiat: str, max_retries: int = 3) -> dict:
+        """
+        Cached entry point: one fetch per (asset, fiat, tradeType, filters)
+        within P2P_CACHE_TTL, shared by every brand. Concurrent identical
+        requests wait for the same fetch. Errors are never cached.
+        """
+        return await self.cache.aget_or_load(
+            self._cache_key(fiat),
+            lambda: self._fetch_top5_async(fiat, max_retries),
+            cacheable=lambda result: result.get("status") == "success",
+        )
+
+    def fetch_top5_completed_order_rates(self, fiat: str, max_retries: int = 3) -> dict:
+        """Sync shim for fetch_top5_completed_order_rates_async (call it from worker threads)."""
+        return self._run_sync(self.fetch_top5_completed_order_rates_async(fiat, max_retries))
+
+    def _run_sync(self, coro):
+        """
+        Run `coro` on the loop that owns the browser pool and wait for the result.
+        - called from a worker thread while that loop runs -> scheduled onto it
+        - called with no loop around (plain script)      -> private background loop
+        Blocking inside a running event loop would deadlock it, so that raises.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coro.close()
+            raise RuntimeError("Called the sync P2P API inside a running event loop; await the *_async variant instead.")
+
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="p2p-loop", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
 
 
 
@@ -1,12 +1,48 @@
+import json
 import httpx
 import certifi
 from utils.env_loader import get_env
 import logging
 
 BINANCE_URL = get_env("BINANCE_URL_US", "https://api.binance.com/api/v3/ticker/price")
+# Spot assets priced against BINANCE_QUOTE (BTC -> BTCUSDT, ...)
+BINANCE_ASSETS = get_env("BINANCE_ASSETS", "BTC,ETH").split(",")
+BINANCE_QUOTE = get_env("BINANCE_QUOTE", "USDT")
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+_client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Shared keep-alive client for every spot request of the run (one TLS
+    handshake, HTTP/2 when `h2` is installed and BINANCE_HTTP2 != 0).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            verify=certifi.where(),
+            timeout=10.0,
+            http2=HTTP2_AVAILABLE and get_env("BINANCE_HTTP2", "1") == "1",
+            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client. Call once at the end of the run."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def fetch_binance_price(symbol: str) -> dict:
     """
@@ -17,11 +53,10 @@ async def fetch_binance_price(symbol: str) -> dict:
         - error: error message on failure
     """
     try:
-        async with httpx.AsyncClient(verify=certifi.where(), timeout=10.0) as client:
-            response = await client.get(BINANCE_URL, params={"symbol": symbol})
-            response.raise_for_status()
-            logger.info(f"Fetched {symbol} price successfully")
-            return {"status": "success", "data": response.json(), "error": None}
+        response = await get_client().get(BINANCE_URL, params={"symbol": symbol})
+        response.raise_for_status()
+        logger.info(f"Fetched {symbol} price successfully")
+        return {"status": "success", "data": response.json(), "error": None}
     except httpx.ConnectError as e:
         logger.error(f"Connection error for {symbol}: {e}")
         return {"status": "error", "data": None, "error": str(e)}
@@ -42,38 +77,118 @@ async def fetch_binance_price(symbol: str) -> dict:
         return {"status": "error", "data": None, "error": str(e)}
 
 
-async def get_btc_eth_prices() -> dict:
+async def fetch_binance_prices(symbols: list) -> dict:
     """
-    Fetch BTC and ETH prices from Binance and return a unified status.
+    Fetches Binance prices for several symbols in ONE batched ticker request
+    (`symbols=["BTCUSDT","ETHUSDT",...]`).
+    Returns a dict with:
+        - status: "success" or "error"
+        - data: {symbol: {"symbol": ..., "price": ...}} on success
+        - error: error message on failure
+    """
+    label = ",".join(symbols)
+    try:
+        response = await get_client().get(
+            BINANCE_URL, params={"symbols": json.dumps(symbols, separators=(",", ":"))}
+        )
+        response.raise_for_status()
+        data = {ticker["symbol"]: ticker for ticker in response.json()}
+
+        missing = [symbol for symbol in symbols if symbol not in data]
+        if missing:
+            return {"status": "error", "data": None, "error": f"Missing tickers: {', '.join(missing)}"}
+
+        logger.info(f"Fetched {label} prices successfully")
+        return {"status": "success", "data": data, "error": None}
+    except httpx.ConnectError as e:
+        logger.error(f"Connection error for {label}: {e}")
+        return {"status": "error", "data": None, "error": str(e)}
+    except httpx.HTTPStatusError as e:
+        logger.error(
+            f"HTTP error for {label}: {e.response.status_code} - {e.response.text}"
+        )
+        return {
+            "status": "error",
+            "data": None,
+            "error": f"{e.response.status_code} - {e.response.text}",
+        }
+    except httpx.RequestError as e:
+        logger.error(f"Request error for {label}: {e}")
+        return {"status": "error", "data": None, "error": str(e)}
+    except Exception as e:
+        logger.error(f"Unexpected error for {label}: {e}")
+        return {"status": "error", "data": None, "error": str(e)}
+
+
+async def get_prices(symbols: list) -> dict:
     """
-    btc = await fetch_binance_price("BTCUSDT")
-    eth = await fetch_binance_price("ETHUSDT")
-    # usdt = await fetch_binance_price("USDTUSD")
-    
+    Prices for several symbols in one batched request over the shared client
+    (duplicates are requested once).
+    Returns a dict with:
+        - status: "success" or "error"
+        - data: {symbol: {"symbol": ..., "price": ...}} on success
+        - error: error message on failure
+    """
+    return await fetch_binance_prices(list(dict.fromkeys(symbol.upper() for symbol in symbols)))
 
-    errors = []
-    if btc.get("status") != "success":
-        errors.append(f"BTC: {btc.get('error')}")
-    if eth.get("status") != "success":
-        errors.append(f"ETH: {eth.get('error')}")
-    # if usdt.get("status") != "success":
-    #     errors.append(f"USDT: {usdt.get('error')}")
 
-    if errors:
-        return {"status": "error", "data": {"BTC": btc, "ETH": eth}, "error": "; ".join(errors)}
+def _spot_symbols(assets: list, quote: str) -> dict:
+    assets = [asset.strip().upper() for asset in (assets or BINANCE_ASSETS) if asset.strip()]
+    return {asset: f"{asset}{quote}" for asset in assets}
 
-    return {"status": "success", "data": {"BTC": btc["data"], "ETH": eth["data"]}, "error": None}
 
-async def get_usdt_to_usd() -> dict:
+def _spot_result(prices: dict, symbols: dict) -> dict:
+    if prices.get("status") != "success":
+        return {"status": "error", "data": None, "error": prices.get("error")}
+    return {
+        "status": "success",
+        "data": {asset: prices["data"][symbol] for asset, symbol in symbols.items()},
+        "error": None,
+    }
+
+
+def _usdt_result(prices: dict) -> dict:
+    if prices.get("status") != "success":
+        return {"status": "error", "data": {"USDT": prices}, "error": f"USDT: {prices.get('error')}"}
+    return {"status": "success", "data": {"USDT": prices["data"]["USDTUSD"]}, "error": None}
+
+
+async def get_spot_prices(assets: list = None, quote: str = BINANCE_QUOTE) -> dict:
     """
-    Fetch USDT to USD from Binance and return a unified status.
+    Fetch {asset}{quote} for every asset (default: BINANCE_ASSETS) in a single
+    batched request, keyed by asset the way convert_crypto_prices expects:
+        {'BTC': {'symbol': 'BTCUSDT', 'price': '110273.46'}, ...}
     """
-    usdt = await fetch_binance_price("USDTUSD")
-    errors = []
-    if usdt.get("status") != "success":
-        errors.append(f"BTC: {usdt.get('error')}")
+    symbols = _spot_symbols(assets, quote)
+    return _spot_result(await get_prices(list(symbols.values())), symbols)
 
-    if errors:
-        return {"status": "error", "data": {"USDT": usdt}, "error": "; ".join(errors)}
 
-    return {"status": "success", "data": {"USDT": usdt["data"]}, "error": None}
\ No newline at end of file
+async def get_spot_and_usdt_prices(assets: list = None, quote: str = BINANCE_QUOTE) -> dict:
+    """
+    The whole spot stage in ONE request: the BINANCE_ASSETS pairs plus USDTUSD.
+    Returns a dict with:
+        - status: "success" if both parts succeeded, else "error"
+        - data: {"usdt": get_usdt_to_usd() result, "spot": get_spot_prices() result}
+        - error: error message on failure
+    """
+    symbols = _spot_symbols(assets, quote)
+    prices = await get_prices([*symbols.values(), "USDTUSD"])
+    usdt, spot = _usdt_result(prices), _spot_result(prices, symbols)
+    return {
+        "status": prices.get("status"),
+        "data": {"usdt": usdt, "spot": spot},
+        "error": prices.get("error"),
+    }
+
+
+async def get_btc_eth_prices() -> dict:
+    """
+    Fetch BTC and ETH prices from Binance and return a unified status.
+    """
+    return await get_spot_prices(["BTC", "ETH"])
+
+async def get_usdt_to_usd() -> dict:
+    """
+    Fetch USDT to USD from Binance and return a unified status.
+    """
+    return _usdt_result(await get_prices(["USDTUSD"]))
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import logging
+import time
+from utils.env_loader import get_env
+from services.binance_service import BINANCE_ASSETS, BINANCE_QUOTE, fetch_binance_price
+
+try:
+    import websockets
+except ImportError:  # optional: without it every lookup falls back to REST
+    websockets = None
+
+BINANCE_WS_URL = get_env("BINANCE_WS_URL", "wss://stream.binance.com:9443/stream")
+
+logger = logging.getLogger(__name__)
+
+
+class PriceStreamer:
+    """
+    Keeps the last trade / best bid-ask of each symbol in memory from the
+    Binance combined websocket stream (`<symbol>@trade` + `<symbol>@bookTicker`).
+
+    latest() is a dict read while the stream is fresh and falls back to the
+    REST ticker when it is stale, disconnected or `websockets` is missing.
+    """
+
+    def __init__(self, symbols: list = None, url: str = BINANCE_WS_URL, reconnect_delay: float = 1.0):
+        self.symbols = [symbol.upper() for symbol in (symbols or [f"{asset}{BINANCE_QUOTE}" for asset in BINANCE_ASSETS])]
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self._prices = {}  # symbol -> {"price", "trade", "bid", "ask", "time"}
+        self._task = None
+
+    @property
+    def stream_url(self) -> str:
+        streams = "/".join(
+            f"{symbol.lower()}@{channel}" for symbol in self.symbols for channel in ("trade", "bookTicker")
+        )
+        return f"{self.url}?streams={streams}"
+
+    async def start(self):
+        if websockets is None:
+            logger.warning("websockets is not installed, PriceStreamer will use REST only")
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async with websockets.connect(self.stream_url) as ws:
+                    logger.info(f"Price stream connected: {', '.join(self.symbols)}")
+                    async for message in ws:
+                        self._on_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Price stream error: {e}, reconnecting in {self.reconnect_delay}s")
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _on_message(self, message):
+        payload = json.loads(message)
+        data = payload.get("data", payload)  # combined stream wraps events in {"stream", "data"}
+        symbol = data.get("s")
+        if not symbol:
+            return
+
+        entry = self._prices.setdefault(symbol, {"price": None, "trade": None, "bid": None, "ask": None, "time": 0.0})
+        if data.get("e") == "trade":
+            entry["trade"] = float(data["p"])
+        elif "b" in data and "a" in data:  # bookTicker has no event type
+            entry["bid"] = float(data["b"])
+            entry["ask"] = float(data["a"])
+        else:
+            return
+
+        if entry["trade"] is not None:
+            entry["price"] = entry["trade"]
+        else:
+            entry["price"] = (entry["bid"] + entry["ask"]) / 2
+        entry["time"] = time.time()
+
+    def get_cached(self, symbol: str, max_age: float = 5.0) -> dict | None:
+        """Cached entry if it is younger than `max_age` seconds, else None."""
+        entry = self._prices.get(symbol.upper())
+        if entry is None or entry["price"] is None or time.time() - entry["time"] > max_age:
+            return None
+        return entry
+
+    async def latest(self, symbol: str, max_age: float = 5.0) -> dict:
+        """
+        Latest price for `symbol`, same shape as fetch_binance_price:
+            {"status", "data": {"symbol", "price"}, "error", "source": "stream" | "rest"}
+        """
+        symbol = symbol.upper()
+        entry = self.get_cached(symbol, max_age)
+        if entry is not None:
+            return {"status": "success", "data": {"symbol": symbol, "price": str(entry["price"])}, "error": None, "source": "stream"}
+
+        result = await fetch_binance_price(symbol)
+        if result.get("status") == "success":
+            self._prices[symbol] = {
+                **self._prices.get(symbol, {"trade": None, "bid": None, "ask": None}),
+                "price": float(result["data"]["price"]),
+                "time": time.time(),
+            }
+        return {**result, "source": "rest"}
@@ -1,11 +1,19 @@
+import asyncio
 import csv
 import os
+import httpx
 import requests
+import threading
+import time
 import traceback, hashlib
-from bs4 import BeautifulSoup
-from utils.env_loader import get_env
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from utils.env_loader import get_env, get_cache_path
+from utils.html_inputs import extract_input_value
 from utils.crypto_settings import fetch_crypto_settings
+from utils.session_store import SessionStore
 from utils.crypto_utils import calculate_diff_and_save
+from utils.sheet_writer import SheetWriteBuffer
 
 class BOScrapperService:
     def __init__(self):
@@ -14,6 +22,7 @@ class BOScrapperService:
         """
         self.session = requests.Session()
         self.cookies = None
+        self._cookies_lock = threading.Lock()  # brands may log in from several threads
 
         # BO URLs
         self.bo_brand = [url.strip() for url in get_env("BO_BRAND", "").split(",") if url.strip()]
@@ -24,6 +33,12 @@ class BOScrapperService:
         if not (len(self.bo_urls) == len(self.base_urls) == len(self.bo_login_urls)):
             raise ValueError("BO_URLS, BASE_URLS, and BO_LOGIN_URLS must have the same length/order.")
 
+        # BO cookies kept between runs, see utils/session_store.py
+        self.session_store = SessionStore()
+
+        # filled by test_accessible_async, read by scrappe_bo to skip dead brands
+        self.reachability = {}
+
         self.username = get_env("BO_USERNAME", "None")
         self.password = get_env("BO_PASSWORD", "None")
 
@@ -31,21 +46,175 @@ class BOScrapperService:
         """
         Test if each BO URL is reachable (VPN check).
         Returns the first accessible URL, else None.
+        Sync wrapper for test_accessible_async (not for use inside an event loop).
+        """
+        return asyncio.run(self.test_accessible_async(logger))
+
+    async def test_accessible_async(self, logger, timeout: float = 5.0) -> str | None:
         """
-        for bo_url in self.bo_urls:
+        Probe every BO URL at the same time (VPN check).
+        Returns the first accessible URL and cancels the probes still running,
+        else None. Per-URL results land in self.reachability for the rest of the run:
+            {url: {"ok": True/False/None, "status": int|None, "latency": float|None, "error": str|None}}
+        ok is None for probes cancelled before they answered.
+        """
+        async def probe(client, bo_url):
+            started = time.perf_counter()
             try:
-                logger.info(f"→ Testing {bo_url}")
-                response = self.session.get(bo_url, timeout=5)
-                if response.ok:
-                    logger.success(f"→ Accessible: {bo_url}")
-                    return bo_url
-                else:
-                    logger.error(f"→ Not accessible {bo_url}, status: {response.status_code}")
-            except Exception:
-                logger.warn(f"→ Error on {bo_url}:\n{traceback.format_exc()}")
+                response = await client.get(bo_url)
+                result = {"ok": response.is_success, "status": response.status_code, "error": None}
+            except Exception as e:
+                result = {"ok": False, "status": None, "error": repr(e)}
+            result["latency"] = round(time.perf_counter() - started, 3)
+            self.reachability[bo_url] = result
+            return bo_url, result
+
+        self.reachability = {bo_url: {"ok": None, "status": None, "latency": None, "error": "cancelled"} for bo_url in self.bo_urls}
+        accessible = None
+        logger.info(f"→ Testing {len(self.bo_urls)} BO URLs")
+
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+            pending = {asyncio.create_task(probe(client, bo_url)) for bo_url in self.bo_urls}
+            while pending and accessible is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    bo_url, result = task.result()
+                    if result["ok"]:
+                        logger.success(f"→ Accessible: {bo_url} ({result['latency']}s)")
+                        accessible = accessible or bo_url
+                    elif result["status"] is not None:
+                        logger.error(f"→ Not accessible {bo_url}, status: {result['status']}")
+                    else:
+                        logger.warn(f"→ Error on {bo_url}: {result['error']}")
+
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if accessible is None:
+            logger.error("→ None of the BO URLs are accessible (VPN required).")
+        return accessible
+
+    def is_known_unreachable(self, bo_url: str) -> bool:
+        """True only if this run's probe answered and the URL was not healthy."""
+        return self.reachability.get(bo_url, {}).get("ok") is False
+
+    def _brands(self):
+        return list(enumerate(zip(self.bo_brand, self.bo_urls, self.base_urls, self.bo_login_urls), start=1))
+
+    def _scrappe_brand(
+        self,
+        logger,
+        session: requests.Session,
+        index: int,
+        bo_brand: str,
+        bo_url: str,
+        base_url: str,
+        login_url: str,
+        binance_usdtusd,
+        xe_data,
+        converted_currency_value,
+        current_usd_value,
+        p2p_service,
+        localtime,
+        sheet_writer: SheetWriteBuffer = None
+    ) -> bool:
+        """
+        Load the crypto settings of one brand (reusing the saved session when it
+        is still valid, else logging in) and save the diff.
+        Returns False when the BO rejects the login, raises on any other error.
+        """
+        logger.info(f"→ [{index}] → Trying {bo_brand} - {bo_url}")
+
+        # 0) Reuse the saved session if the settings endpoint still answers with JSON
+        crypto_data = None
+        if self.session_store.load(bo_brand, session):
+            crypto_data = fetch_crypto_settings(session, logger, base_url)
+            if crypto_data is not None:
+                logger.success(f"→ [{index}] Reused saved session for {bo_brand}")
+            else:
+                logger.warn(f"→ [{index}] Saved session for {bo_brand} expired, logging in again")
+                self.session_store.drop(bo_brand)
+                session.cookies.clear()
+
+        if crypto_data is None:
+            if not self._login(logger, session, index, bo_url, base_url, login_url):
+                return False
+
+            # 6) Fetch crypto settings
+            crypto_data = fetch_crypto_settings(session, logger, base_url)
+            if crypto_data is not None:
+                self.session_store.save(bo_brand, session)
+        logger.success(f"→ [{index}] Crypto Settings: {crypto_data}")
 
-        logger.error("→ None of the BO URLs are accessible (VPN required).")
-        return None
+        # 7) Save CSV diff
+        calculate_diff_and_save(
+            binance_usdtusd, xe_data, current_usd_value, bo_brand, crypto_data, converted_currency_value, logger, p2p_service, localtime,
+            sheet_writer
+        )
+        logger.success(f"→ Differences saved")
+        return True
+
+    def _login(self, logger, session: requests.Session, index: int, bo_url: str, base_url: str, login_url: str) -> bool:
+        """Full BO login handshake + dashboard load. False when the BO rejects the credentials."""
+        # 1) GET login page
+        response = session.get(bo_url, timeout=10)
+        response.raise_for_status()
+
+        if get_env("BO_SAVE_LOGIN_PAGES", "0") == "1":
+            self._save_login_page(bo_url, response.text)
+
+        # 2) Scrape randomCode
+        random_code_val = extract_input_value(response.text, "randomCode")
+        if random_code_val is None:
+            raise RuntimeError("randomCode input not found on login page.")
+
+        logger.success(f"→ [{index}] RANDOM CODE: {random_code_val}")
+
+        # 3) POST credentials
+        auth_payload = {
+            "username": self.username,
+            "password": hashlib.sha1(self.password.encode()).hexdigest(),
+            "randomCode": random_code_val,
+        }
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+            "Accept": "*/*",
+            "Origin": base_url,
+            "Referer": bo_url,
+            "X-Requested-With": "XMLHttpRequest",
+            "User-Agent": (
+                "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36"
+            ),
+        }
+
+        login = session.post(login_url, data=auth_payload, headers=headers, timeout=10)
+        login.raise_for_status()
+
+        # 4) Check JSON response for errors
+        resp_json = login.json()
+        if "errors" in resp_json:
+            logger.error(f"→ [{index}] Login failed: {resp_json['errors']}")
+            return False
+        else:
+            with self._cookies_lock:
+                self.cookies = session.cookies.get_dict()
+            logger.success(f"→ [{index}] ✅ Authentication successful on {bo_url}")
+
+        # 5) Load dashboard
+        dashboard_url = f"{base_url}/page/manager/payment/cryptocurrencySetting.jsp"
+        dashboard_response = session.get(dashboard_url, timeout=10)
+        dashboard_response.raise_for_status()
+        logger.success(f"→ Loaded dashboard, session cookies: {session.cookies.get_dict()}")
+        return True
+
+    def _save_login_page(self, bo_url: str, page: str):
+        """Keep a copy of the login page (benchmarks/bench_login_tokens.py reads these)."""
+        path = get_cache_path(os.path.join("bo_login_pages", f"{urlparse(bo_url).hostname}.html"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(page)
 
     def scrappe_bo(
         self,
@@ -63,84 +232,97 @@ class BOScrapperService:
         """
         logger.info("→ Authenticating user...")
         success = False
+        # every brand's rows are written together at the end of the run
+        sheet_writer = SheetWriteBuffer()
 
-        for index, (bo_brand, bo_url, base_url, login_url) in enumerate(
-            zip(self.bo_brand, self.bo_urls, self.base_urls, self.bo_login_urls), start=1
-        ):
+        for index, (bo_brand, bo_url, base_url, login_url) in self._brands():
+            if self.is_known_unreachable(bo_url):
+                logger.warn(f"→ [{index}] Skipping {bo_brand}, {bo_url} was unreachable")
+                continue
             try:
-                logger.info(f"→ [{index}] → Trying {bo_brand} - {bo_url}")
-
                 # Reset cookies
                 self.session.cookies.clear()
 
-                # 1) GET login page
-                response = self.session.get(bo_url, timeout=10)
-                response.raise_for_status()
-
-                # 2) Scrape randomCode
-                soup = BeautifulSoup(response.text, "html.parser")
-                random_tag = soup.find("input", {"id": "randomCode"})
-                if random_tag is None:
-                    raise RuntimeError("randomCode input not found on login page.")
-
-                random_code_val = random_tag["value"]
-                logger.success(f"→ [{index}] RANDOM CODE: {random_code_val}")
-
-                # 3) POST credentials
-                auth_payload = {
-                    "username": self.username,
-                    "password": hashlib.sha1(self.password.encode()).hexdigest(),
-                    "randomCode": random_code_val,
-                }
-                headers = {
-                    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                    "Accept": "*/*",
-                    "Origin": base_url,
-                    "Referer": bo_url,
-                    "X-Requested-With": "XMLHttpRequest",
-                    "User-Agent": (
-                        "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36"
-                    ),
-                }
-
-                login = self.session.post(login_url, data=auth_payload, headers=headers, timeout=10)
-                login.raise_for_status()
-
-                # 4) Check JSON response for errors
-                resp_json = login.json()
-                if "errors" in resp_json:
-                    logger.error(f"→ [{index}] Login failed: {resp_json['errors']}")
-                    continue
-                else:
-                    self.cookies = self.session.cookies.get_dict()
-                    logger.success(f"→ [{index}] ✅ Authentication successful on {bo_url}")
-
-                # 5) Load dashboard
-                dashboard_url = f"{base_url}/page/manager/payment/cryptocurrencySetting.jsp"
-                dashboard_response = self.session.get(dashboard_url, timeout=10)
-                dashboard_response.raise_for_status()
-                logger.success(f"→ Loaded dashboard, session cookies: {self.session.cookies.get_dict()}")
-
-                # 6) Fetch crypto settings
-                crypto_data = fetch_crypto_settings(self.session, logger, base_url)
-                logger.success(f"→ [{index}] Crypto Settings: {crypto_data}")
-
-                # 7) Save CSV diff
-                calculate_diff_and_save(
-                    binance_usdtusd, xe_data, current_usd_value, bo_brand, crypto_data, converted_currency_value, logger, p2p_service, localtime
-                )
-                logger.success(f"→ Differences saved")
-
-                # Mark success
-                success = True
+                if self._scrappe_brand(
+                    logger, self.session, index, bo_brand, bo_url, base_url, login_url,
+                    binance_usdtusd, xe_data, converted_currency_value, current_usd_value, p2p_service, localtime,
+                    sheet_writer
+                ):
+                    # Mark success
+                    success = True
 
             except Exception:
                 logger.error(f"→ [{index}] ⚠️ Error on {bo_url}:\n{traceback.format_exc()}")
 
+        try:
+            sheet_writer.flush(logger)
+        except Exception:
+            logger.error(f"→ ⚠️ Writing to Google Sheets failed:\n{traceback.format_exc()}")
+            success = False
+
         if success:
             return True
 
         logger.error("→ All BO URLs failed.")
         return False
 
+    def scrappe_bo_concurrent(
+        self,
+        logger,
+        binance_usdtusd,
+        xe_data,
+        converted_currency_value,
+        current_usd_value,
+        p2p_service,
+        localtime,
+        max_workers: int = None
+    ) -> dict:
+        """
+        Same work as scrappe_bo, but every brand runs in its own thread with
+        its own requests.Session (at most `max_workers` at a time).
+        Returns:
+            - success: True if at least one brand succeeded
+            - brands: [{"brand", "url", "success", "seconds", "error"}, ...] in BO_BRAND order
+        """
+        logger.info("→ Authenticating user (concurrent)...")
+        brands = []
+        for index, brand in self._brands():
+            if self.is_known_unreachable(brand[1]):
+                logger.warn(f"→ [{index}] Skipping {brand[0]}, {brand[1]} was unreachable")
+            else:
+                brands.append((index, brand))
+        # every brand's rows are written together at the end of the run, in
+        # BO_BRAND order whatever order the threads finish in
+        sheet_writer = SheetWriteBuffer()
+
+        def run_brand(index, bo_brand, bo_url, base_url, login_url) -> dict:
+            started = time.perf_counter()
+            result = {"brand": bo_brand, "url": bo_url, "success": False, "seconds": 0.0, "error": None}
+            try:
+                with requests.Session() as session:
+                    result["success"] = self._scrappe_brand(
+                        logger, session, index, bo_brand, bo_url, base_url, login_url,
+                        binance_usdtusd, xe_data, converted_currency_value, current_usd_value, p2p_service, localtime,
+                        sheet_writer.ordered(index)
+                    )
+                if not result["success"]:
+                    result["error"] = "Login rejected"
+            except Exception:
+                result["error"] = traceback.format_exc()
+                logger.error(f"→ [{index}] ⚠️ Error on {bo_url}:\n{result['error']}")
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers or max(len(brands), 1), thread_name_prefix="bo") as pool:
+            futures = [pool.submit(run_brand, index, *brand) for index, brand in brands]
+            results = [future.result() for future in futures]
+
+        success = any(result["success"] for result in results)
+        try:
+            sheet_writer.flush(logger)
+        except Exception:
+            logger.error(f"→ ⚠️ Writing to Google Sheets failed:\n{traceback.format_exc()}")
+            success = False
+        if not success:
+            logger.error("→ All BO URLs failed.")
+        return {"success": success, "brands": results}
@@ -1,3 +1,102 @@
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+
+
+class ConversionEngine:
+    """
+    Asset x currency conversion matrix in one outer product.
+
+    prices (USD, one per asset) and FX rates (one per currency) are held as
+    NumPy vectors; `matrix[i, j] = prices[i] * rates[j]`, rounded to 2 decimals.
+
+    precision:
+        "float"   float64 product rounded exactly like round(price * rate, 2)
+                  (default, what convert_crypto_prices returns)
+        "fixed"   exact integer fixed point: prices and rates are scaled to integers
+                  from their raw strings (as many decimals as the longest one),
+                  multiplied, and rounded half-up to cents; same results as
+                  "decimal". int64 when the products fit, Python ints otherwise
+        "decimal" Decimal per cell, rounded half-up (exact, slowest)
+    """
+
+    def __init__(self, binance_data: dict, xe_data: dict, precision: str = "float"):
+        if precision not in ("float", "fixed", "decimal"):
+            raise ValueError(f"Unknown precision: {precision}")
+
+        rates = xe_data.get("rates", {})
+        self.precision = precision
+        self.assets = list(binance_data)
+        self.currencies = list(rates)
+        self._raw_prices = [str(coin_data["price"]) for coin_data in binance_data.values()]
+        self._raw_rates = [str(rate) for rate in rates.values()]
+        self.prices = np.array([float(price) for price in self._raw_prices], dtype=np.float64)
+        self.rates = np.array([float(rate) for rate in self._raw_rates], dtype=np.float64)
+        self._matrix = None
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """(assets x currencies) float64 matrix of converted, 2-decimal values."""
+        if self._matrix is None:
+            if self.precision == "float":
+                self._matrix = self._round_like_python(np.outer(self.prices, self.rates))
+            elif self.precision == "fixed":
+                self._matrix = (self._fixed_cents() / 100).astype(np.float64)
+            else:
+                self._matrix = np.array(self.decimal_matrix(), dtype=np.float64).reshape(len(self.assets), len(self.currencies))
+        return self._matrix
+
+    @staticmethod
+    def _round_like_python(values: np.ndarray) -> np.ndarray:
+        """
+        np.round(values, 2), except for cells sitting on a half-cent tie, where
+        np.round (which rounds values * 100) and round() can disagree; those few
+        are rounded with round() so the result matches the old per-cell loop.
+        """
+        rounded = np.round(values, 2)
+        cents = values * 100
+        ties = np.abs(cents - np.floor(cents) - 0.5) < 1e-6
+        for index in zip(*np.nonzero(ties)):
+            rounded[index] = round(float(values[index]), 2)
+        return rounded
+
+    @staticmethod
+    def _scaled(raw_values: list):
+        """Raw decimal strings -> (integers, decimals) with value = integer / 10**decimals."""
+        values = [Decimal(value) for value in raw_values]
+        decimals = max([-value.as_tuple().exponent for value in values] + [0])
+        return [int(value.scaleb(decimals)) for value in values], decimals
+
+    def _fixed_cents(self) -> np.ndarray:
+        price_units, price_decimals = self._scaled(self._raw_prices)
+        rate_units, rate_decimals = self._scaled(self._raw_rates)
+        scale = 10 ** max(price_decimals + rate_decimals - 2, 0)
+        cents_shift = 10 ** max(2 - price_decimals - rate_decimals, 0)
+
+        # int64 only if the largest product (plus the rounding half) cannot overflow
+        largest = max(map(abs, price_units), default=0) * max(map(abs, rate_units), default=0)
+        dtype = np.int64 if largest * cents_shift + scale < 2 ** 63 else object
+        product = np.outer(np.array(price_units, dtype=dtype), np.array(rate_units, dtype=dtype)) * cents_shift
+        return (product + scale // 2) // scale
+
+    def decimal_matrix(self) -> list:
+        """Exact Decimal values (rounded half-up to cents) as a list of rows."""
+        cent = Decimal("0.01")
+        prices = [Decimal(price) for price in self._raw_prices]
+        rates = [Decimal(rate) for rate in self._raw_rates]
+        return [[(price * rate).quantize(cent, rounding=ROUND_HALF_UP) for rate in rates] for price in prices]
+
+    def value(self, asset: str, currency: str) -> float:
+        return float(self.matrix[self.assets.index(asset), self.currencies.index(currency)])
+
+    def as_dict(self) -> dict:
+        """The matrix in the convert_crypto_prices shape: {coin: {currency: value}}."""
+        rows = self.matrix.tolist()
+        return {
+            coin: dict(zip(self.currencies, row))
+            for coin, row in zip(self.assets, rows)
+        }
+
+
 def convert_crypto_prices(binance_data: dict, xe_data: dict) -> dict:
     """
     Multiply Binance USD prices with XE conversion rates.
@@ -13,14 +112,4 @@ def convert_crypto_prices(binance_data: dict, xe_data: dict) -> dict:
             'ETH': {'BDT': 533107.54, 'PKR': 1243564.73, 'INR': 385859.61}
         }
     """
-    rates = xe_data.get("rates", {})
-    results = {}
-
-    for coin, coin_data in binance_data.items():
-        usd_price = float(coin_data["price"])
-        results[coin] = {
-            currency: round(usd_price * rate, 2)
-            for currency, rate in rates.items()
-        }
-
-    return results
+    return ConversionEngine(binance_data, xe_data).as_dict()
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+import httpx
+from utils.env_loader import get_env, get_cache_path
+from utils.p2p_parser import loads
+
+P2P_SEARCH_URL = get_env("P2P_URL", "https://p2p.binance.com/bapi/c2c/v2/friendly/c2c/adv/search")
+
+# Same body p2p.py posts; the captured request is layered on top of it.
+P2P_PAYLOAD_TEMPLATE = {
+    "fiat": "BDT",
+    "rows": 10,
+    "tradeType": "SELL",
+    "asset": "USDT",
+    "countries": [],
+    "proMerchantAds": False,
+    "shieldMerchantAds": False,
+    "filterType": "all",
+    "periods": [],
+    "additionalKycVerifyFilter": 0,
+    "publisherType": "merchant",
+    "payTypes": [],
+    "classifies": ["mass", "profession", "fiat_trade"],
+    "tradedWith": False,
+    "followed": False
+}
+
+# Headers that must not be replayed verbatim (httpx sets them itself)
+_SKIP_HEADERS = {"content-length", "host", "cookie", "connection"}
+
+
+class ReplayCaptureError(Exception):
+    """The cached capture is no longer accepted (401/403 or unexpected response schema)."""
+
+
+class CapturedRequestStore:
+    """
+    Persists one captured search request (url, headers, cookies, payload)
+    as JSON on disk. Captures older than `ttl_seconds` are treated as missing.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: int = None):
+        self.path = path or get_cache_path("p2p_capture.json")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(get_env("P2P_CAPTURE_TTL", "21600"))
+
+    def load(self) -> dict | None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                captured = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - captured.get("captured_at", 0) > self.ttl_seconds:
+            return None
+        return captured
+
+    def save(self, captured: dict) -> dict:
+        """Persist `captured` stamped with captured_at; returns the stamped copy."""
+        captured = {**captured, "captured_at": time.time()}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(captured, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        return captured
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class P2PReplayClient:
+    """
+    Replays a captured P2P search request through one pooled httpx client,
+    no browser involved.
+    """
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def build_payload(captured: dict, fiat: str, page_number: int) -> dict:
+        return {**P2P_PAYLOAD_TEMPLATE, **(captured.get("post_data") or {}), "fiat": fiat, "page": page_number}
+
+    @staticmethod
+    def build_headers(captured: dict) -> dict:
+        return {
+            key: value
+            for key, value in (captured.get("headers") or {}).items()
+            if key.lower() not in _SKIP_HEADERS and not key.startswith(":")
+        }
+
+    async def fetch_page(self, captured: dict, fiat: str, page_number: int) -> dict:
+        """
+        POST one search page. Raises ReplayCaptureError when the capture
+        needs to be refreshed, httpx errors for anything else.
+        """
+        response = await self._get_client().post(
+            captured.get("url") or P2P_SEARCH_URL,
+            json=self.build_payload(captured, fiat, page_number),
+            headers=self.build_headers(captured),
+            cookies=captured.get("cookies") or {},
+        )
+        if response.status_code in (401, 403):
+            raise ReplayCaptureError(f"{response.status_code} from P2P search endpoint")
+        response.raise_for_status()
+
+        try:
+            page_data = loads(response.content)
+        except ValueError:
+            raise ReplayCaptureError("P2P search endpoint did not return JSON")
+
+        if not isinstance(page_data, dict) or not isinstance(page_data.get("data"), list):
+            raise ReplayCaptureError(f"Unexpected P2P response schema: {str(page_data)[:200]}")
+        return page_data
@@ -0,0 +1,33 @@
+import asyncio
+from datetime import datetime
+from utils.p2p_snapshots import list_snapshots, load_snapshot_pages
+
+
+class SnapshotBackend:
+    """
+    Fetch backend for BinanceP2PService that serves saved
+    binance_{FIAT}_pages_<timestamp>.json files instead of Binance.
+
+    Serves the newest snapshot of a fiat, or the newest one taken at or
+    before `as_of` when given.
+    """
+
+    def __init__(self, directory: str = ".", as_of: datetime = None):
+        self.directory = directory
+        self.as_of = as_of
+
+    def snapshot_path(self, fiat: str) -> str:
+        snapshots = [
+            snapshot for snapshot in list_snapshots(self.directory, fiat)
+            if self.as_of is None or snapshot[1] <= self.as_of
+        ]
+        if not snapshots:
+            raise FileNotFoundError(f"No P2P snapshot for {fiat} in {self.directory}")
+        return snapshots[-1][2]
+
+    async def fetch_pages(self, fiat: str, max_pages: int = 3) -> list:
+        pages = await asyncio.to_thread(load_snapshot_pages, self.snapshot_path(fiat))
+        return pages[:max_pages]
+
+    async def close(self):
+        pass
@@ -1,13 +1,22 @@
+import asyncio
+import json
+import os
+import time
 import httpx
-from utils.env_loader import get_env
+from utils.env_loader import get_env, get_cache_path
 import logging
 
 XE_URL = get_env("XE_URL", "https://www.xe.com/api/protected/midmarket-converter/")
 XE_AUTH = get_env("XE_AUTH", "Basic bG9kZXN0YXI6cHVnc25heA==")
 XE_CURRENCIES = get_env("XE_CURRENCIES", "BDT,PKR,INR,NPR").split(",")
+XE_CACHE_TTL = int(get_env("XE_CACHE_TTL", "3600"))
+# optional: caches older than this are refreshed before returning (unset = never)
+XE_CACHE_MAX_STALE = int(get_env("XE_CACHE_MAX_STALE")) if get_env("XE_CACHE_MAX_STALE") else None
 
 logger = logging.getLogger(__name__)
 
+_refresh_task = None
+
 async def fetch_xe_rates() -> dict:
     """
     Fetch filtered XE mid-market rates (USD → selected currencies).
@@ -55,3 +64,76 @@ async def fetch_xe_rates() -> dict:
     except Exception as e:
         logger.error(f"Unexpected error fetching XE rates: {e}")
         return {"status": "error", "data": None, "error": str(e)}
+
+
+def _load_cached_rates() -> dict | None:
+    """Last good XE result from disk, if it covers every XE_CURRENCIES entry."""
+    try:
+        with open(get_cache_path("xe_rates.json"), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    rates = cached.get("data", {}).get("rates", {})
+    if any(cur not in rates for cur in XE_CURRENCIES):
+        return None
+    return cached
+
+
+def _save_cached_rates(data: dict):
+    path = get_cache_path("xe_rates.json")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time(), "data": data}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+async def _refresh_xe_rates() -> dict:
+    result = await fetch_xe_rates()
+    if result.get("status") == "success":
+        _save_cached_rates(result["data"])
+    else:
+        logger.warning(f"XE refresh failed, keeping last good rates: {result.get('error')}")
+    return result
+
+
+async def fetch_xe_rates_cached(ttl: int = None, max_stale: int = None) -> dict:
+    """
+    XE rates with a disk cache (stale-while-revalidate).
+        - cache younger than `ttl` (XE_CACHE_TTL): returned, no request
+        - older cache: returned immediately, refreshed in the background
+        - cache older than `max_stale` (XE_CACHE_MAX_STALE, opt-in): refreshed
+          now; if that fails the cached rates are still returned
+        - no cache: fetched now (the only case that can return an error)
+    Same return shape as fetch_xe_rates, plus "cached"/"age"/"stale" keys
+    ("stale": older than 2 x `ttl`, i.e. background refreshes have been failing).
+    """
+    global _refresh_task
+    ttl = XE_CACHE_TTL if ttl is None else ttl
+    max_stale = XE_CACHE_MAX_STALE if max_stale is None else max_stale
+
+    cached = _load_cached_rates()
+    if cached is None:
+        result = await _refresh_xe_rates()
+        return {**result, "cached": False, "age": 0, "stale": False}
+
+    age = time.time() - cached.get("fetched_at", 0)
+    if max_stale is not None and age > max_stale:
+        logger.warning(f"XE cache is {age:.0f}s old (max {max_stale}s), fetching now")
+        result = await _refresh_xe_rates()
+        if result.get("status") == "success":
+            return {**result, "cached": False, "age": 0, "stale": False}
+        logger.error(f"XE is unreachable, using last good rates from {age / 3600:.1f}h ago")
+    elif age > ttl and (_refresh_task is None or _refresh_task.done()):
+        logger.info(f"XE cache is {age:.0f}s old, refreshing in the background")
+        _refresh_task = asyncio.create_task(_refresh_xe_rates())
+
+    return {"status": "success", "data": cached["data"], "error": None, "cached": True, "age": age, "stale": age > 2 * ttl}
+
+
+async def wait_for_xe_refresh():
+    """Let a pending background refresh finish (call before the event loop exits)."""
+    if _refresh_task is not None and not _refresh_task.done():
+        try:
+            await _refresh_task
+        except Exception as e:
+            logger.error(f"XE background refresh failed: {e}")
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from services import binance_stream_service
+from services.binance_stream_service import PriceStreamer
+
+
+def _trade(symbol: str, price: str) -> str:
+    return json.dumps({"stream": f"{symbol.lower()}@trade", "data": {"e": "trade", "s": symbol, "p": price}})
+
+
+def _book_ticker(symbol: str, bid: str, ask: str) -> str:
+    return json.dumps({"stream": f"{symbol.lower()}@bookTicker", "data": {"u": 1, "s": symbol, "b": bid, "a": ask}})
+
+
+async def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class StandInServer:
+    """Local combined-stream server: each connection gets its list of frames."""
+
+    def __init__(self, connections: list, close_after_send: bool = False):
+        self.connections = connections
+        self.close_after_send = close_after_send
+        self.connected = 0
+        self.disconnected = asyncio.Event()
+
+    async def handler(self, ws):
+        frames = self.connections[min(self.connected, len(self.connections) - 1)]
+        self.connected += 1
+        for frame in frames:
+            await ws.send(frame)
+        if self.close_after_send and self.connected < len(self.connections):
+            await ws.close()
+            return
+        await ws.wait_closed()
+        self.disconnected.set()
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/stream"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def test_latest_uses_fresh_stream_data():
+    async def run():
+        frames = [_book_ticker("BTCUSDT", "100", "101"), _trade("BTCUSDT", "100.5")]
+        async with StandInServer([frames]) as server:
+            streamer = PriceStreamer(["BTCUSDT"], url=server.url, reconnect_delay=0.05)
+            await streamer.start()
+            await _wait_for(lambda: (streamer.get_cached("BTCUSDT") or {}).get("trade") is not None)
+
+            result = await streamer.latest("BTCUSDT")
+            await streamer.close()
+
+        assert result["source"] == "stream"
+        assert result["data"] == {"symbol": "BTCUSDT", "price": "100.5"}
+        assert streamer.get_cached("BTCUSDT")["bid"] == 100.0
+
+    asyncio.run(run())
+
+
+def test_latest_falls_back_to_rest_when_stale(monkeypatch):
+    calls = []
+
+    async def fake_fetch(symbol):
+        calls.append(symbol)
+        return {"status": "success", "data": {"symbol": symbol, "price": "99.0"}, "error": None}
+
+    monkeypatch.setattr(binance_stream_service, "fetch_binance_price", fake_fetch)
+
+    async def run():
+        async with StandInServer([[_trade("BTCUSDT", "100.5")]]) as server:
+            streamer = PriceStreamer(["BTCUSDT"], url=server.url, reconnect_delay=0.05)
+            await streamer.start()
+            await _wait_for(lambda: streamer.get_cached("BTCUSDT") is not None)
+            await asyncio.sleep(0.05)
+
+            result = await streamer.latest("BTCUSDT", max_age=0.01)
+            await streamer.close()
+        return result
+
+    result = asyncio.run(run())
+    assert calls == ["BTCUSDT"]
+    assert result["source"] == "rest"
+    assert result["data"]["price"] == "99.0"
+
+
+def test_reconnects_after_server_closes():
+    async def run():
+        connections = [[_trade("BTCUSDT", "100.5")], [_trade("BTCUSDT", "200.25")]]
+        async with StandInServer(connections, close_after_send=True) as server:
+            streamer = PriceStreamer(["BTCUSDT"], url=server.url, reconnect_delay=0.05)
+            await streamer.start()
+            await _wait_for(lambda: (streamer.get_cached("BTCUSDT") or {}).get("price") == 200.25)
+            result = await streamer.latest("BTCUSDT")
+            await streamer.close()
+        return server, result
+
+    server, result = asyncio.run(run())
+    assert server.connected == 2
+    assert result["source"] == "stream"
+    assert result["data"]["price"] == "200.25"
+
+
+def test_close_cancels_the_stream_task():
+    async def run():
+        async with StandInServer([[_trade("BTCUSDT", "100.5")]]) as server:
+            streamer = PriceStreamer(["BTCUSDT"], url=server.url, reconnect_delay=0.05)
+            await streamer.start()
+            task = streamer._task
+            await _wait_for(lambda: streamer.get_cached("BTCUSDT") is not None)
+
+            await streamer.close()
+            await asyncio.wait_for(server.disconnected.wait(), 5)
+
+            assert streamer._task is None
+            assert task.cancelled()
+            await streamer.close()  # closing twice is a no-op
+
+    asyncio.run(run())
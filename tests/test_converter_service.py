@@ -0,0 +1,44 @@
+import random
+from services.converter_service import ConversionEngine, convert_crypto_prices
+
+
+def _engine(prices: dict, rates: dict, precision: str) -> ConversionEngine:
+    binance_data = {coin: {"symbol": f"{coin}USDT", "price": price} for coin, price in prices.items()}
+    return ConversionEngine(binance_data, {"rates": rates}, precision)
+
+
+def test_fixed_matches_decimal_for_sub_dollar_prices():
+    prices = {"DOGE": "0.23456", "XRP": "2.8765", "SHIB": "0.00001234", "TRX": "0.3412"}
+    rates = {"BDT": 121.64, "PKR": 283.7, "INR": 88.01234567}
+
+    fixed = _engine(prices, rates, "fixed")
+    decimal = _engine(prices, rates, "decimal")
+
+    assert fixed.as_dict() == decimal.as_dict()
+    assert fixed.value("DOGE", "BDT") == 28.53
+
+
+def test_fixed_matches_decimal_on_random_inputs():
+    rng = random.Random(7)
+    prices = {f"C{i}": f"{rng.uniform(0.0001, 120000):.8f}" for i in range(30)}
+    rates = {f"F{j}": rng.uniform(0.5, 400) for j in range(20)}
+
+    assert _engine(prices, rates, "fixed").as_dict() == _engine(prices, rates, "decimal").as_dict()
+
+
+def _loop_convert(binance_data: dict, xe_data: dict) -> dict:
+    """convert_crypto_prices before the engine: round() per cell."""
+    return {
+        coin: {currency: round(float(coin_data["price"]) * rate, 2) for currency, rate in xe_data["rates"].items()}
+        for coin, coin_data in binance_data.items()
+    }
+
+
+def test_convert_crypto_prices_matches_old_loop_on_two_decimal_inputs():
+    # 2-decimal prices and rates hit half-cent ties often, where np.round and round() disagree
+    rng = random.Random(11)
+    binance_data = {f"C{i}": {"symbol": f"C{i}USDT", "price": f"{rng.uniform(0.01, 5000):.2f}"} for i in range(400)}
+    xe_data = {"rates": {f"F{j}": round(rng.uniform(0.5, 400), 2) for j in range(500)}}
+
+    assert convert_crypto_prices(binance_data, xe_data) == _loop_convert(binance_data, xe_data)
+    assert convert_crypto_prices({"BTC": {"price": "1930.41"}}, {"rates": {"BDT": 119.5}}) == {"BTC": {"BDT": 230683.99}}
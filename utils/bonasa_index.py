@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, date
+from utils.env_loader import get_env, get_cache_path
+
+BONASA_TAB = "BONASA"
+
+
+def _to_float(value: str):
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def build_index(rows: list) -> dict:
+    """
+    Rows of the BONASA tab (A:C) -> {date: (date_str, purchase_rate, effective_rate)}.
+    Cells that are not "d/m/YYYY" dates (header, blanks) are skipped; the first
+    row of a date wins.
+    """
+    index = {}
+    for row in rows:
+        if not row:
+            continue
+        date_str = row[0].strip()
+        try:
+            row_date = datetime.strptime(date_str, "%d/%m/%Y").date()
+        except ValueError:
+            continue
+        if row_date not in index:
+            index[row_date] = (
+                date_str,
+                _to_float(row[1].strip()) if len(row) > 1 else None,
+                _to_float(row[2].strip()) if len(row) > 2 else None,
+            )
+    return index
+
+
+class BonasaIndex:
+    """
+    Date -> (purchase rate, effective rate) lookup over the BONASA tab, built
+    from a single `A:C` range read and kept for `ttl` seconds (BONASA_INDEX_TTL).
+
+    With BONASA_INDEX_CACHE=1 the index is also kept in .cache/bonasa_index.json
+    so runs within the TTL skip the read entirely. invalidate() drops both
+    copies and is called whenever the BONASA tab is rewritten.
+    """
+
+    def __init__(self, ttl: int = None, use_disk: bool = None, path: str = None):
+        self.ttl = ttl if ttl is not None else int(get_env("BONASA_INDEX_TTL", "600"))
+        self.use_disk = use_disk if use_disk is not None else get_env("BONASA_INDEX_CACHE", "0") == "1"
+        self.path = path
+        self._index = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _cache_path(self) -> str:
+        return self.path or get_cache_path("bonasa_index.json")
+
+    def _load_disk(self):
+        try:
+            with open(self._cache_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - data.get("saved_at", 0) > self.ttl:
+            return None
+        self._loaded_at = data["saved_at"]
+        return {date.fromisoformat(key): tuple(value) for key, value in data["rows"].items()}
+
+    def _save_disk(self, index: dict):
+        path = self._cache_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "saved_at": self._loaded_at,
+                "rows": {key.isoformat(): list(value) for key, value in index.items()},
+            }, f)
+        os.replace(tmp_path, path)
+
+    def _get_index(self, sh) -> dict:
+        with self._lock:
+            if self._index is not None and time.time() - self._loaded_at <= self.ttl:
+                return self._index
+
+            index = self._load_disk() if self.use_disk else None
+            if index is None:
+                try:
+                    ws = sh.worksheet(BONASA_TAB)
+                except Exception:
+                    return {}  # Sheet not found
+                index = build_index(ws.get("A:C"))
+                self._loaded_at = time.time()
+                if self.use_disk:
+                    self._save_disk(index)
+
+            self._index = index
+            return index
+
+    def lookup(self, sh, day: date):
+        """(date_str, purchase_rate, effective_rate) for `day`, or None."""
+        return self._get_index(sh).get(day)
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+            self._loaded_at = 0.0
+            try:
+                os.remove(self._cache_path())
+            except OSError:
+                pass
+
+
+bonasa_index = BonasaIndex()
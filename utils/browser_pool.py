@@ -0,0 +1,109 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium with a small pool of reusable contexts.
+
+    - start()/close() own the Playwright driver and browser lifecycle
+    - at most `max_contexts` contexts are checked out at the same time
+    - a context is recycled after `max_uses` checkouts or when a fetch fails
+    - the browser itself is relaunched if it crashed / disconnected
+    """
+
+    def __init__(self, max_contexts: int = 2, max_uses: int = 20, headless: bool = True):
+        self.max_contexts = max_contexts
+        self.max_uses = max_uses
+        self.headless = headless
+
+        self._playwright = None
+        self._browser = None
+        self._idle = []  # [(context, uses), ...]
+        self._semaphore = None
+        self._lock = None
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self):
+        """Start the Playwright driver and launch the browser (idempotent)."""
+        if self.started:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_contexts)
+        self._lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        await self._launch()
+
+    async def close(self):
+        """Close every pooled context, the browser and the Playwright driver."""
+        if not self.started:
+            return
+        for context, _ in self._idle:
+            await self._close_context(context)
+        self._idle = []
+
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+
+        await self._playwright.stop()
+        self._playwright = None
+
+    async def _launch(self):
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._idle = []
+
+    async def _close_context(self, context):
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def _acquire(self):
+        async with self._lock:
+            # Browser crashed or was closed underneath us -> relaunch it
+            if self._browser is None or not self._browser.is_connected():
+                await self._launch()
+
+            if self._idle:
+                return self._idle.pop()
+            return await self._browser.new_context(), 0
+
+    async def _release(self, context, uses: int, failed: bool):
+        if failed or uses >= self.max_uses or not self._browser.is_connected():
+            await self._close_context(context)
+            return
+        self._idle.append((context, uses))
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Check out a context from the pool and yield (context, page).
+        The page is closed on exit; the context goes back to the pool.
+        """
+        if not self.started:
+            await self.start()
+
+        async with self._semaphore:
+            context, uses = await self._acquire()
+            page = None
+            failed = False
+            try:
+                page = await context.new_page()
+                yield context, page
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        failed = True
+                await self._release(context, uses + 1, failed)
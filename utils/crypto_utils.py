@@ -1,56 +1,29 @@
 import os
 from typing import Dict, Any
 from utils.logger import Logger
-from utils.google_client import get_gspread_client
-from utils.env_loader import get_env
+from utils.google_client import get_spreadsheet
+from utils.sheet_writer import SheetWriteBuffer
+from utils.bonasa_index import bonasa_index
 from datetime import datetime
 
-gc = get_gspread_client()
-sh = gc.open_by_key(get_env("SHEET_URL"))
-
-
-def get_or_create_tab(sh, tab_name, fieldnames):
-    """Return worksheet, create if missing with header row."""
-    try:
-        ws = sh.worksheet(tab_name)
-    except Exception:
-        ws = sh.add_worksheet(title=tab_name, rows="1000", cols="30")
-        ws.append_row(fieldnames)
-        return ws
-
-    headers = ws.row_values(1)
-    if not headers:
-        ws.append_row(fieldnames)
-    return ws
-
 
 def fetch_today_bonasa_row(sh, today):
     """
-    Fetch today's row from BONASA tab.
+    Fetch today's row from BONASA tab (through the cached date index, so only
+    the first call of a run reads the sheet).
     Returns a dict: {"date": str, "bdt_purchase_rate": float, "effective_conversion_rate": float}
     or None if no match is found.
     """
-    try:
-        ws = sh.worksheet("BONASA")
-    except Exception:
-        return None  # Sheet not found
-
-    col_a = ws.col_values(1)  # Column A (dates)
-    for idx, val in enumerate(col_a, start=1):  # Google Sheets rows are 1-based
-        try:
-            # Convert cell to datetime.date (Sheet date format may be "d/m/YYYY")
-            cell_date = datetime.strptime(val.strip(), "%d/%m/%Y").date()
-            if cell_date == today:
-                row = ws.row_values(idx)
-                return {
-                    "date": val.strip(),
-                    "bdt_purchase_rate": float(row[1]) if len(row) > 1 and row[1] else None,
-                    "effective_conversion_rate": float(row[2]) if len(row) > 2 and row[2] else None,
-                }
-        except ValueError:
-            continue  # Skip invalid rows
+    entry = bonasa_index.lookup(sh, today)
+    if entry is None:
+        return None
 
-    return None
+    date_str, purchase_rate, effective_rate = entry
+    return {
+        "date": date_str,
+        "bdt_purchase_rate": purchase_rate,
+        "effective_conversion_rate": effective_rate,
+    }
 
 
 def calculate_diff_and_save(
@@ -62,13 +35,16 @@ def calculate_diff_and_save(
     converted_currency_value: Any,  # dict or dict_items
     logger: Logger,
     p2p_service,
-    localtime
+    localtime,
+    sheet_writer: SheetWriteBuffer = None
 ):
     """
-    Calculate % differences and save results directly into Google Sheets.
+    Calculate % differences and save results into Google Sheets.
     Two tabs:
       - LocalDiff (BTC/ETH with BO vs Converted values)
       - P2P_USDT (top 5 Binance P2P ads)
+    Rows go into `sheet_writer` (flushed by the caller once per run); without
+    one they are written right away.
     """
     if not isinstance(converted_currency_value, dict):
         converted_currency_value = dict(converted_currency_value)
@@ -84,7 +60,7 @@ def calculate_diff_and_save(
         except ValueError:
             today_date = datetime.strptime(localtime.split()[0], "%Y-%m-%d").date()
 
-    bonasa_row = fetch_today_bonasa_row(sh, today_date)
+    bonasa_row = fetch_today_bonasa_row(get_spreadsheet(), today_date)
     effective_conversion_rate = (
         bonasa_row["effective_conversion_rate"]
         if bonasa_row and bonasa_row["effective_conversion_rate"]
@@ -210,6 +186,8 @@ def calculate_diff_and_save(
             diff_results_local.append(row)
             logger.success(f"→ {row}")
 
+    writer = sheet_writer or SheetWriteBuffer()
+
     # Save LocalDiff (BTC/ETH)
     if diff_results_local:
         fieldnames_local = [
@@ -223,10 +201,9 @@ def calculate_diff_and_save(
             "Exchange Rate",
             "Exchange Rate Sign",
         ]
-        ws_local = get_or_create_tab(sh, "BTC_AND_ETH_CONVERSION", fieldnames_local)
         rows = [list(row.values()) for row in diff_results_local]
-        ws_local.append_rows(rows, value_input_option="USER_ENTERED")
-        logger.success("→ Differences appended to Google Sheet: LocalDiff")
+        writer.add("BTC_AND_ETH_CONVERSION", fieldnames_local, rows, logger)
+        logger.success("→ Differences queued for Google Sheet: LocalDiff")
 
     # Save USDT (P2P)
     if diff_results_usdt:
@@ -234,7 +211,9 @@ def calculate_diff_and_save(
         for i in range(1, 6):
             fieldnames_usdt += [f"Top{i}_Nick", f"Top{i}_Orders", f"Top{i}_Price"]
 
-        ws_usdt = get_or_create_tab(sh, "USDT_CONVERSION", fieldnames_usdt)
         rows = [list(row.values()) for row in diff_results_usdt]
-        ws_usdt.append_rows(rows, value_input_option="USER_ENTERED")
-        logger.success("→ USDT P2P rates appended to Google Sheet: P2P_USDT")
+        writer.add("USDT_CONVERSION", fieldnames_usdt, rows, logger)
+        logger.success("→ USDT P2P rates queued for Google Sheet: P2P_USDT")
+
+    if sheet_writer is None:
+        writer.flush(logger)
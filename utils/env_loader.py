@@ -5,3 +5,9 @@ load_dotenv()
 
 def get_env(key: str, default: str = None) -> str:
     return os.getenv(key, default)
+
+def get_cache_path(filename: str) -> str:
+    """Return a path inside CACHE_DIR (default: .cache), creating the folder if needed."""
+    cache_dir = get_env("CACHE_DIR", ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, filename)
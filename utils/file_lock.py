@@ -0,0 +1,38 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def file_lock(path: str, timeout: float = 30.0, stale_after: float = 60.0, poll: float = 0.1):
+    """
+    Cross-process lock on `path` + ".lock" (O_CREAT | O_EXCL, works on Windows too).
+    A lock file older than `stale_after` seconds is treated as left behind by a
+    crashed process and removed. Raises TimeoutError after `timeout` seconds.
+    """
+    lock_path = f"{path}.lock"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue  # released (or removed) in between, try again
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Could not lock {path} within {timeout}s")
+            time.sleep(poll)
+
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
@@ -1,6 +1,78 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from utils.env_loader import get_env
+from google.oauth2 import service_account
+from utils.env_loader import get_env, get_cache_path
+from utils.file_lock import file_lock
+
+SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+]
+
+
+class CachedServiceAccountCredentials(service_account.Credentials):
+    """
+    Service account credentials whose access token is shared between processes
+    through .cache/google_token.json (GOOGLE_TOKEN_CACHE).
+
+    refresh() takes the cached token while it has more than
+    GOOGLE_TOKEN_MARGIN seconds left; otherwise one process (under a file
+    lock) hits the token endpoint and stores the new token for the others.
+    """
+
+    def _token_cache_path(self) -> str:
+        return get_env("GOOGLE_TOKEN_CACHE") or get_cache_path("google_token.json")
+
+    def _token_cache_key(self) -> str:
+        return f"{self.service_account_email}|{' '.join(sorted(self._scopes or []))}"
+
+    def _load_cached_token(self) -> bool:
+        try:
+            with open(self._token_cache_path(), "r", encoding="utf-8") as f:
+                entry = json.load(f).get(self._token_cache_key())
+        except (OSError, ValueError):
+            return False
+
+        margin = float(get_env("GOOGLE_TOKEN_MARGIN", "300"))
+        if not entry or entry.get("expiry", 0) - time.time() <= margin:
+            return False
+
+        self.token = entry["token"]
+        # google-auth keeps expiry as naive UTC
+        self.expiry = datetime.fromtimestamp(entry["expiry"], timezone.utc).replace(tzinfo=None)
+        return True
+
+    def _save_cached_token(self):
+        path = self._token_cache_path()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+
+        data[self._token_cache_key()] = {
+            "token": self.token,
+            "expiry": self.expiry.replace(tzinfo=timezone.utc).timestamp(),
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def refresh(self, request):
+        if self._load_cached_token():
+            return
+
+        with file_lock(self._token_cache_path()):
+            # another process may have refreshed while we waited for the lock
+            if self._load_cached_token():
+                return
+            super().refresh(request)
+            self._save_cached_token()
 
 
 def get_gspread_client():
@@ -20,9 +92,36 @@ def get_gspread_client():
         "universe_domain": get_env("UNIVERSE_DOMAIN"),
     }
 
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(service_account_info, scope)
+    creds = CachedServiceAccountCredentials.from_service_account_info(service_account_info, scopes=SCOPES)
     return gspread.authorize(creds)
+
+
+_client = None
+_spreadsheets = {}  # key -> gspread.Spreadsheet
+_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide gspread client, authorized on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = get_gspread_client()
+    return _client
+
+
+def get_spreadsheet(key: str = None):
+    """
+    Shared spreadsheet handle for `key` (defaults to SHEET_URL), opened on
+    first use and reused by every caller afterwards.
+    """
+    key = key or get_env("SHEET_URL")
+    spreadsheet = _spreadsheets.get(key)
+    if spreadsheet is None:
+        client = get_client()
+        with _lock:
+            spreadsheet = _spreadsheets.get(key)
+            if spreadsheet is None:
+                spreadsheet = _spreadsheets[key] = client.open_by_key(key)
+    return spreadsheet
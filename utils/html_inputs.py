@@ -0,0 +1,60 @@
+import html as html_lib
+import re
+
+_ATTR_RE = re.compile(r"""([^\s=/>]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+
+
+def _tag_attrs(tag: str) -> dict:
+    return {
+        match.group(1).lower(): html_lib.unescape(next(g for g in match.groups()[1:] if g is not None))
+        for match in _ATTR_RE.finditer(tag)
+    }
+
+
+def _scan_input(page: str, name: str) -> str | None:
+    """
+    Find <input id="name"> / <input name="name"> by jumping straight to the
+    occurrences of `name` and inspecting only the enclosing tag.
+    """
+    start = 0
+    while True:
+        pos = page.find(name, start)
+        if pos == -1:
+            return None
+        start = pos + len(name)
+
+        tag_start = page.rfind("<", 0, pos)
+        tag_end = page.find(">", pos)
+        if tag_start == -1 or tag_end == -1 or page[tag_start:tag_start + 6].lower() != "<input":
+            continue
+        # `name` must sit inside this tag, not after an earlier ">"
+        if page.find(">", tag_start, pos) != -1:
+            continue
+
+        attrs = _tag_attrs(page[tag_start + 6:tag_end])
+        if name in (attrs.get("id"), attrs.get("name")):
+            return attrs.get("value", "")
+
+
+def extract_input_values(page: str, names: list) -> dict:
+    """
+    Values of the <input> elements whose id or name is in `names`.
+    Uses the targeted scanner and falls back to BeautifulSoup for anything it
+    could not find. Missing inputs map to None.
+    """
+    values = {name: _scan_input(page, name) for name in names}
+
+    missing = [name for name, value in values.items() if value is None]
+    if missing:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(page, "html.parser")
+        for name in missing:
+            tag = soup.find("input", {"id": name}) or soup.find("input", {"name": name})
+            if tag is not None:
+                values[name] = tag.get("value", "")
+    return values
+
+
+def extract_input_value(page: str, name: str) -> str | None:
+    return extract_input_values(page, [name])[name]
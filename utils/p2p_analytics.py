@@ -0,0 +1,169 @@
+"""
+Historical P2P rate analytics over saved captures.
+
+Captures (binance_*_pages_*.json snapshots and/or the P2PArchive) are
+streamed in chunks into columnar NumPy arrays; every aggregate is then
+computed vectorized across all snapshots of the chunk. Only the small
+per-snapshot results are kept, so memory stays bounded by `chunk_size`.
+
+    python -m utils.p2p_analytics PKR --days 30 --exclude "Bank Transfer"
+"""
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+from utils.p2p_parser import parse_ads
+from utils.p2p_snapshots import list_snapshots, load_snapshot_pages
+from utils.p2p_archive import P2PArchive
+
+METRICS = ("mean", "median", "vwap")
+
+
+def iter_captures(fiat: str, since: datetime = None, until: datetime = None, snapshot_dir: str = ".", archive: P2PArchive = None):
+    """Yield (timestamp, pages) for `fiat` from snapshot files, then from the archive, oldest first."""
+    if snapshot_dir:
+        for _, taken_at, path in list_snapshots(snapshot_dir, fiat):
+            if (since and taken_at < since) or (until and taken_at > until):
+                continue
+            yield taken_at, load_snapshot_pages(path)
+
+    if archive is not None:
+        for record in archive.iter_records(fiat, since, until):
+            yield datetime.fromisoformat(record["timestamp"]), record["pages"]
+
+
+def _to_columns(captures: list, exclude_methods: frozenset) -> dict:
+    """One chunk of captures -> flat ad columns keyed by snapshot number."""
+    snapshot_ids, prices, orders, available = [], [], [], []
+    for snapshot_id, (_, pages) in enumerate(captures):
+        for page_data in pages:
+            for ad in parse_ads(page_data):
+                if exclude_methods and exclude_methods.intersection(ad.trade_methods):
+                    continue
+                snapshot_ids.append(snapshot_id)
+                prices.append(ad.price)
+                orders.append(ad.orders or 0)
+                available.append(float(ad.available or 0))
+
+    return {
+        "snapshot": np.asarray(snapshot_ids, dtype=np.int64),
+        "price": np.asarray(prices, dtype=np.float64),
+        "orders": np.asarray(orders, dtype=np.int64),
+        "available": np.asarray(available, dtype=np.float64),
+        "timestamp": np.asarray([taken_at for taken_at, _ in captures], dtype="datetime64[s]"),
+    }
+
+
+def _group_starts(sorted_ids: np.ndarray) -> np.ndarray:
+    return np.searchsorted(sorted_ids, sorted_ids, side="left")
+
+
+def _chunk_metrics(columns: dict, top_k: int) -> dict:
+    """Top-k (by monthly orders) mean / median / VWAP for every snapshot in the chunk."""
+    n_snapshots = len(columns["timestamp"])
+    snapshot, price, orders, available = columns["snapshot"], columns["price"], columns["orders"], columns["available"]
+
+    # Rank ads inside each snapshot by orders desc, ties in page order (same as the service)
+    order = np.lexsort((np.arange(len(snapshot)), -orders, snapshot))
+    ranked_ids = snapshot[order]
+    rank = np.arange(len(order)) - _group_starts(ranked_ids)
+    top = order[rank < top_k]
+
+    top_ids, top_price, top_available = snapshot[top], price[top], available[top]
+    count = np.bincount(top_ids, minlength=n_snapshots)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(top_ids, weights=top_price, minlength=n_snapshots) / count
+        vwap = (
+            np.bincount(top_ids, weights=top_price * top_available, minlength=n_snapshots)
+            / np.bincount(top_ids, weights=top_available, minlength=n_snapshots)
+        )
+
+    # Median: sort each snapshot's top-k prices and average the middle element(s)
+    by_price = np.lexsort((top_price, top_ids))
+    sorted_price = top_price[by_price]
+    starts = np.zeros(n_snapshots, dtype=np.int64)
+    starts[1:] = np.cumsum(count)[:-1]
+    has_ads = count > 0
+    median = np.full(n_snapshots, np.nan)
+    low = starts[has_ads] + (count[has_ads] - 1) // 2
+    high = starts[has_ads] + count[has_ads] // 2
+    median[has_ads] = (sorted_price[low] + sorted_price[high]) / 2
+
+    return {"timestamp": columns["timestamp"], "ads": count, "mean": mean, "median": median, "vwap": vwap}
+
+
+def snapshot_rates(
+    fiat: str,
+    since: datetime = None,
+    until: datetime = None,
+    exclude_methods=(),
+    snapshot_dir: str = ".",
+    archive: P2PArchive = None,
+    top_k: int = 5,
+    chunk_size: int = 500,
+) -> dict:
+    """
+    Per-snapshot top-k rates for one fiat.
+    Returns numpy arrays: timestamp, ads (ads used), mean, median, vwap.
+    """
+    exclude_methods = frozenset(exclude_methods)
+    parts = []
+    chunk = []
+    for capture in iter_captures(fiat, since, until, snapshot_dir, archive):
+        chunk.append(capture)
+        if len(chunk) >= chunk_size:
+            parts.append(_chunk_metrics(_to_columns(chunk, exclude_methods), top_k))
+            chunk = []
+    if chunk:
+        parts.append(_chunk_metrics(_to_columns(chunk, exclude_methods), top_k))
+
+    if not parts:
+        return {
+            "timestamp": np.array([], dtype="datetime64[s]"),
+            "ads": np.array([], dtype=np.int64),
+            **{metric: np.array([], dtype=np.float64) for metric in METRICS},
+        }
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def hourly_rates(fiat: str, **kwargs) -> dict:
+    """
+    snapshot_rates() bucketed per hour: the mean of each metric over the
+    snapshots taken in that hour, plus the number of snapshots.
+    """
+    rates = snapshot_rates(fiat, **kwargs)
+    hours, bucket = np.unique(rates["timestamp"].astype("datetime64[h]"), return_inverse=True)
+
+    result = {"hour": hours, "snapshots": np.bincount(bucket, minlength=len(hours))}
+    for metric in METRICS:
+        values = rates[metric]
+        valid = ~np.isnan(values)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[metric] = (
+                np.bincount(bucket[valid], weights=values[valid], minlength=len(hours))
+                / np.bincount(bucket[valid], minlength=len(hours))
+            )
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hourly top-5 P2P rates from saved captures.")
+    parser.add_argument("fiat")
+    parser.add_argument("--days", type=int, default=30, help="look-back window")
+    parser.add_argument("--exclude", action="append", default=[], help="trade method to ignore (repeatable)")
+    parser.add_argument("--snapshot-dir", default=".")
+    parser.add_argument("--no-archive", action="store_true", help="only read snapshot files")
+    args = parser.parse_args()
+
+    report = hourly_rates(
+        args.fiat.upper(),
+        since=datetime.now() - timedelta(days=args.days),
+        exclude_methods=args.exclude,
+        snapshot_dir=args.snapshot_dir,
+        archive=None if args.no_archive else P2PArchive(),
+    )
+    print(f"{'hour':<20} {'snaps':>5} {'mean':>10} {'median':>10} {'vwap':>10}")
+    for i, hour in enumerate(report["hour"]):
+        print(
+            f"{str(hour):<20} {report['snapshots'][i]:>5} {report['mean'][i]:10.3f} "
+            f"{report['median'][i]:10.3f} {report['vwap'][i]:10.3f}"
+        )
@@ -0,0 +1,117 @@
+import gzip
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from utils.env_loader import get_env
+
+_STOP = object()
+
+
+class P2PArchive:
+    """
+    Append-only, compressed history of raw P2P captures.
+
+    Layout under `root`:
+        {YYYY-MM-DD}/{FIAT}.jsonl.gz   one gzip member per capture; the members
+                                       concatenate into a valid gzip/JSONL file
+        {YYYY-MM-DD}/index.jsonl       {"fiat", "timestamp", "segment", "offset", "length"}
+
+    submit() only enqueues; compression and disk writes happen on a
+    background thread so archiving never delays the rate calculation.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or get_env("P2P_ARCHIVE_DIR", os.path.join("archive", "p2p"))
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    # ---------------------------------------------------------------- writing
+
+    def submit(self, fiat: str, pages: list, captured_at: datetime = None):
+        """Queue one capture for archiving. Returns immediately."""
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="p2p-archive", daemon=True)
+                self._worker.start()
+        self._queue.put((fiat.upper(), captured_at or datetime.now(), pages))
+
+    def close(self):
+        """Write everything still queued, then stop the background thread."""
+        with self._worker_lock:
+            worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        self._queue.put(_STOP)
+        worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            try:
+                self._append(*item)
+            except Exception as e:
+                print(f"P2P archive write failed: {e!r}")
+
+    def _append(self, fiat: str, captured_at: datetime, pages: list):
+        day = captured_at.strftime("%Y-%m-%d")
+        day_dir = os.path.join(self.root, day)
+        os.makedirs(day_dir, exist_ok=True)
+
+        timestamp = captured_at.isoformat(timespec="seconds")
+        record = json.dumps({"fiat": fiat, "timestamp": timestamp, "pages": pages}, ensure_ascii=False, separators=(",", ":"))
+        member = gzip.compress(record.encode("utf-8") + b"\n")
+
+        segment = f"{fiat}.jsonl.gz"
+        segment_path = os.path.join(day_dir, segment)
+        with open(segment_path, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(member)
+
+        entry = {"fiat": fiat, "timestamp": timestamp, "segment": f"{day}/{segment}", "offset": offset, "length": len(member)}
+        with open(os.path.join(day_dir, "index.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    # ---------------------------------------------------------------- reading
+
+    def read_index(self, fiat: str = None, since: datetime = None, until: datetime = None) -> list:
+        """Index entries, oldest first, optionally filtered by fiat and time range."""
+        if not os.path.isdir(self.root):
+            return []
+
+        entries = []
+        for day in sorted(os.listdir(self.root)):
+            if since and day < since.strftime("%Y-%m-%d"):
+                continue
+            if until and day > until.strftime("%Y-%m-%d"):
+                continue
+            index_path = os.path.join(self.root, day, "index.jsonl")
+            if not os.path.exists(index_path):
+                continue
+            with open(index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    taken_at = datetime.fromisoformat(entry["timestamp"])
+                    if fiat and entry["fiat"] != fiat.upper():
+                        continue
+                    if (since and taken_at < since) or (until and taken_at > until):
+                        continue
+                    entries.append(entry)
+        return sorted(entries, key=lambda entry: entry["timestamp"])
+
+    def read_record(self, entry: dict) -> dict:
+        """Decompress the single capture an index entry points at."""
+        with open(os.path.join(self.root, entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        return json.loads(gzip.decompress(member))
+
+    def iter_records(self, fiat: str = None, since: datetime = None, until: datetime = None):
+        for entry in self.read_index(fiat, since, until):
+            yield self.read_record(entry)
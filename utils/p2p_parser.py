@@ -0,0 +1,93 @@
+import heapq
+import json
+from operator import attrgetter
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None
+
+
+def loads(raw):
+    """Decode a P2P response body (bytes/str) with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class P2PAd:
+    """One P2P advert, reduced to the fields the rate calculation uses."""
+
+    __slots__ = (
+        "price",
+        "asset",
+        "available",
+        "min_amount",
+        "max_amount",
+        "nick",
+        "orders",
+        "completion_rate",
+        "trade_methods",
+    )
+
+    def __init__(self, price, asset, available, min_amount, max_amount, nick, orders, completion_rate, trade_methods):
+        self.price = price
+        self.asset = asset
+        self.available = available
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.nick = nick
+        self.orders = orders
+        self.completion_rate = completion_rate
+        self.trade_methods = trade_methods
+
+    def to_dict(self, fiat: str, trade_type: str = "SELL") -> dict:
+        """Same shape the service has always returned in `top_ads`."""
+        return {
+            "price": self.price,
+            "asset": self.asset,
+            "fiat": fiat,
+            "minAmount": self.min_amount,
+            "maxAmount": self.max_amount,
+            "available": self.available,
+            "tradeType": trade_type,
+            "nick": self.nick,
+            "completionRate": self.completion_rate,
+            "orders": self.orders,
+            "tradeMethods": list(self.trade_methods),
+        }
+
+
+def parse_ads(page_data, skip_featured: bool = True) -> list:
+    """
+    Turn one search page (decoded dict or raw bytes) into P2PAd records.
+    Featured ads (non-empty privilegeDesc) are skipped by default.
+    """
+    if isinstance(page_data, (bytes, bytearray, str)):
+        page_data = loads(page_data)
+
+    ads = []
+    append = ads.append
+    for entry in page_data.get("data") or ():
+        if skip_featured and entry.get("privilegeDesc") not in (None, ""):
+            continue
+
+        adv = entry.get("adv") or {}
+        advertiser = entry.get("advertiser") or {}
+        append(P2PAd(
+            float(adv.get("price")),
+            adv.get("asset"),
+            adv.get("surplusAmount"),
+            adv.get("minSingleTransAmount"),
+            adv.get("dynamicMaxSingleTransAmount"),
+            advertiser.get("nickName"),
+            advertiser.get("monthOrderCount", 0),
+            advertiser.get("monthFinishRate"),
+            tuple(method.get("tradeMethodName") for method in adv.get("tradeMethods") or ()),
+        ))
+    return ads
+
+
+def top_ads(ads, k: int = 5) -> list:
+    """The k ads with the most monthly orders (ties keep page order, like sorted())."""
+    return heapq.nlargest(k, ads, key=attrgetter("orders"))
@@ -0,0 +1,31 @@
+import glob
+import os
+import re
+from datetime import datetime
+from utils.p2p_parser import loads
+
+# binance_{FIAT}_pages_{YYYY-mm-dd_HH-MM-SS}.json, as written by the old raw page dump
+SNAPSHOT_RE = re.compile(r"binance_(?P<fiat>[A-Z]+)_pages_(?P<timestamp>\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.json$")
+SNAPSHOT_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+
+def list_snapshots(directory: str = ".", fiat: str = None) -> list:
+    """
+    Saved `{"pages": [...]}` snapshots in `directory`, oldest first.
+    Returns a list of (fiat, datetime, path).
+    """
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "binance_*_pages_*.json")):
+        match = SNAPSHOT_RE.search(os.path.basename(path))
+        if not match:
+            continue
+        if fiat and match["fiat"] != fiat.upper():
+            continue
+        snapshots.append((match["fiat"], datetime.strptime(match["timestamp"], SNAPSHOT_TIME_FORMAT), path))
+    return sorted(snapshots, key=lambda snapshot: (snapshot[1], snapshot[0]))
+
+
+def load_snapshot_pages(path: str) -> list:
+    """Raw search pages stored in one snapshot file."""
+    with open(path, "rb") as f:
+        return loads(f.read()).get("pages", [])
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+import requests
+from utils.env_loader import get_env, get_cache_path
+
+
+class SessionStore:
+    """
+    Per-brand BO session cookies persisted to disk (.cache/bo_sessions.json),
+    so the next run can skip the login handshake while the BO session lives.
+
+    Entries older than `max_age` seconds (BO_SESSION_TTL) or whose cookies
+    have all expired are ignored.
+    """
+
+    def __init__(self, path: str = None, max_age: int = None):
+        self.path = path or get_cache_path("bo_sessions.json")
+        self.max_age = max_age if max_age is not None else int(get_env("BO_SESSION_TTL", "43200"))
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, data: dict):
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self, brand: str, session: requests.Session) -> bool:
+        """Put the saved cookies of `brand` into `session`. False if there is nothing usable."""
+        with self._lock:
+            entry = self._read().get(brand)
+        if not entry or time.time() - entry.get("saved_at", 0) > self.max_age:
+            return False
+
+        now = time.time()
+        cookies = [cookie for cookie in entry.get("cookies", []) if not cookie.get("expires") or cookie["expires"] > now]
+        if not cookies:
+            return False
+
+        for cookie in cookies:
+            session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+                expires=cookie.get("expires"),
+                secure=cookie.get("secure", False),
+            )
+        return True
+
+    def save(self, brand: str, session: requests.Session):
+        cookies = [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "expires": cookie.expires,
+                "secure": cookie.secure,
+            }
+            for cookie in session.cookies
+        ]
+        with self._lock:
+            data = self._read()
+            data[brand] = {"saved_at": time.time(), "cookies": cookies}
+            self._write(data)
+
+    def drop(self, brand: str):
+        with self._lock:
+            data = self._read()
+            if data.pop(brand, None) is not None:
+                self._write(data)
@@ -0,0 +1,162 @@
+import json
+import os
+import random
+import threading
+import time
+from operator import itemgetter
+import requests
+from utils.env_loader import get_env, get_cache_path
+from utils.google_client import get_spreadsheet
+
+
+def get_or_create_tab(sh, tab_name, fieldnames):
+    """Return worksheet, create if missing with header row."""
+    try:
+        ws = sh.worksheet(tab_name)
+    except Exception:
+        ws = sh.add_worksheet(title=tab_name, rows="1000", cols="30")
+        ws.append_row(fieldnames)
+        return ws
+
+    headers = ws.row_values(1)
+    if not headers:
+        ws.append_row(fieldnames)
+    return ws
+
+
+def _is_retryable(error: Exception) -> bool:
+    """429 / 5xx responses and dropped connections are worth another try."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return True
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code == 429 or (status_code is not None and status_code >= 500)
+
+
+class SheetWriteBuffer:
+    """
+    Collects rows for several tabs during a run and appends each tab with a
+    single `append_rows` call on flush() (or as soon as a tab holds
+    `flush_rows` rows). 429, 5xx and connection errors are retried with
+    exponential backoff; rows that still cannot be written are kept in
+    .cache/sheet_backlog.jsonl (SHEET_BACKLOG) and sent with the next flush.
+    Safe to share between brand threads; rows added with an `order` (see
+    ordered()) are written sorted by it, so concurrent brands still land in
+    BO_BRAND order. `sh` defaults to the shared SHEET_URL spreadsheet, opened
+    on the first flush.
+    """
+
+    def __init__(self, sh=None, flush_rows: int = None, max_retries: int = 5):
+        self.sh = sh
+        self.flush_rows = flush_rows or int(get_env("SHEET_FLUSH_ROWS", "500"))
+        self.max_retries = max_retries
+        self.backlog_path = get_env("SHEET_BACKLOG") or get_cache_path("sheet_backlog.jsonl")
+        self._tabs = {}  # tab_name -> {"fieldnames": [...], "rows": [(order, row), ...]}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def add(self, tab_name: str, fieldnames: list, rows: list, logger=None, order: int = 0):
+        with self._lock:
+            tab = self._tabs.setdefault(tab_name, {"fieldnames": fieldnames, "rows": []})
+            tab["rows"].extend((order, row) for row in rows)
+            full = len(tab["rows"]) >= self.flush_rows
+        if full:
+            self.flush(logger, tab_names=[tab_name])
+
+    def ordered(self, order: int) -> "_OrderedWriter":
+        """A view whose add() files rows under `order` (e.g. the brand index)."""
+        return _OrderedWriter(self, order)
+
+    def flush(self, logger=None, tab_names: list = None):
+        """
+        Write the buffered rows (and, on a full flush, the saved backlog): one
+        append per tab. If a tab still fails after the retries, it and the tabs
+        not written yet go to the backlog file and the error is raised.
+        """
+        with self._lock:
+            pending = {
+                # sorted() is stable: rows of the same order keep their add() order
+                tab_name: {"fieldnames": tab["fieldnames"], "rows": [row for _, row in sorted(tab["rows"], key=itemgetter(0))]}
+                for tab_name, tab in self._tabs.items()
+                if tab["rows"] and (tab_names is None or tab_name in tab_names)
+            }
+            for tab_name in pending:
+                self._tabs[tab_name]["rows"] = []
+
+        with self._write_lock:
+            if tab_names is None:
+                pending = self._merge_backlog(pending, logger)
+            if not pending:
+                return
+
+            written = []
+            try:
+                for tab_name, tab in pending.items():
+                    self._with_retry(lambda: self._write_tab(tab_name, tab), logger)
+                    written.append(tab_name)
+                    if logger:
+                        logger.success(f"→ {len(tab['rows'])} rows appended to Google Sheet: {tab_name}")
+            except Exception:
+                unsent = {tab_name: tab for tab_name, tab in pending.items() if tab_name not in written}
+                self._save_backlog(unsent)
+                if logger:
+                    rows = sum(len(tab["rows"]) for tab in unsent.values())
+                    logger.error(f"→ {rows} rows could not be written, kept in {self.backlog_path}")
+                raise
+
+    def _write_tab(self, tab_name: str, tab: dict):
+        sh = self.sh if self.sh is not None else get_spreadsheet()
+        ws = get_or_create_tab(sh, tab_name, tab["fieldnames"])
+        ws.append_rows(tab["rows"], value_input_option="USER_ENTERED")
+
+    def _with_retry(self, write, logger=None):
+        attempt = 0
+        while True:
+            try:
+                return write()
+            except Exception as e:
+                attempt += 1
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                wait_time = 2 ** attempt + random.uniform(0, 1)
+                if logger:
+                    logger.warn(f"→ Sheets write failed ({e}), retrying in {wait_time:.1f}s...")
+                time.sleep(wait_time)
+
+    def _save_backlog(self, tabs: dict):
+        with open(self.backlog_path, "a", encoding="utf-8") as f:
+            for tab_name, tab in tabs.items():
+                f.write(json.dumps({"tab": tab_name, "fieldnames": tab["fieldnames"], "rows": tab["rows"]}, default=str) + "\n")
+
+    def _merge_backlog(self, pending: dict, logger=None) -> dict:
+        """Take the rows left over by earlier runs; they go before this run's rows."""
+        taken_path = f"{self.backlog_path}.{os.getpid()}.sending"
+        try:
+            os.replace(self.backlog_path, taken_path)
+        except OSError:
+            return pending  # no backlog
+
+        merged = {}
+        with open(taken_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                tab = merged.setdefault(entry["tab"], {"fieldnames": entry["fieldnames"], "rows": []})
+                tab["rows"].extend(entry["rows"])
+        os.remove(taken_path)
+
+        if logger:
+            rows = sum(len(tab["rows"]) for tab in merged.values())
+            logger.info(f"→ Sending {rows} rows left over from an earlier run")
+        for tab_name, tab in pending.items():
+            merged.setdefault(tab_name, {"fieldnames": tab["fieldnames"], "rows": []})["rows"].extend(tab["rows"])
+        return merged
+
+
+class _OrderedWriter:
+    def __init__(self, buffer: SheetWriteBuffer, order: int):
+        self.buffer = buffer
+        self.order = order
+
+    def add(self, tab_name: str, fieldnames: list, rows: list, logger=None):
+        self.buffer.add(tab_name, fieldnames, rows, logger, order=self.order)
@@ -1,51 +1,119 @@
+import json
+import os
 from typing import List, Dict, Any
 from utils.logger import Logger
-from utils.google_client import get_gspread_client
-from utils.env_loader import get_env
+from utils.google_client import get_spreadsheet
+from utils.env_loader import get_env, get_cache_path
+from utils.bonasa_index import bonasa_index
 from datetime import datetime
 
-gc = get_gspread_client()
-sh = gc.open_by_key(get_env("SHEET_URL"))
-shs = gc.open_by_key("1BV2gS30b0r28qnTJAXvRYz_6DiCa9KBsdI5izro5hCY")  # Souce Sheet
+source_sheet_key = get_env("BONASA_SOURCE_SHEET", "1BV2gS30b0r28qnTJAXvRYz_6DiCa9KBsdI5izro5hCY")  # Souce Sheet
 tab = get_env("BONASA_TAB", "BONASA")
 result_tab = get_env("EFFECTIVE_CONVERSION_RATE_TAB", "EFFECTIVE CONVERSION RATE")
 
 from datetime import datetime
 from typing import Dict, Any, List
 
-def read_and_calculate_bonasa_sheet_tab(logger: Logger) -> List[Dict[str, Any]]:
-    """Read all rows from the source sheet and calculate effective rates."""
+_pending_source_state = None  # set by an incremental read, saved once the rows are written
+
+
+def _source_state_path() -> str:
+    return get_cache_path("bonasa_source_state.json")
+
+
+def _load_source_state():
     try:
-        logger.info(f"→ Opening worksheet: {tab}...")
-        worksheet = shs.worksheet(tab)
-        rows = worksheet.get_all_values()
+        with open(_source_state_path(), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("sheet") != source_sheet_key or state.get("tab") != tab:
+        return None
+    return state
+
+
+def mark_bonasa_source_processed() -> None:
+    """Remember how far the last read got, so the next incremental read starts there."""
+    global _pending_source_state
+    if _pending_source_state is None:
+        return
+    path = _source_state_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(_pending_source_state, f)
+    os.replace(tmp_path, path)
+    _pending_source_state = None
+
+
+def _effective_rate(purchase_rate: str):
+    """purchase rate * 1.01 rounded to 2 decimals; None for blank / non-numeric cells."""
+    if not purchase_rate:
+        return None
+    try:
+        return round(float(purchase_rate) * 1.01, 2)
+    except ValueError:
+        return None
 
-        if len(rows) <= 1:
-            logger.warning("⚠️ No data (only header row found)")
-            return []
 
-        logger.success("→ Successfully read sheet values")
+def read_and_calculate_bonasa_sheet_tab(logger: Logger, incremental: bool = None) -> List[Dict[str, Any]]:
+    """
+    Read rows from the source sheet and calculate effective rates.
+
+    In incremental mode (BONASA_INCREMENTAL, on by default) only the rows from
+    the last processed one onwards are read; that row is read again as a check
+    that the tab was not rewritten, otherwise the whole tab is read. Call
+    mark_bonasa_source_processed() once the rows are saved.
+    """
+    global _pending_source_state
+    if incremental is None:
+        incremental = get_env("BONASA_INCREMENTAL", "1") == "1"
+
+    try:
+        logger.info(f"→ Opening worksheet: {tab}...")
+        worksheet = get_spreadsheet(source_sheet_key).worksheet(tab)
+
+        state = _load_source_state() if incremental else None
+        rows = None
+        if state:
+            first_row = state["last_row"]
+            rows = worksheet.get(f"A{first_row}:B")
+            if not rows or not rows[0] or rows[0][0].strip() != state["last_date"]:
+                logger.warn("→ Source tab changed since the last run, reading all rows")
+                rows = None
+            else:
+                # get() trims trailing blank cells, get_all_values() pads them: pad to A:B
+                rows = [(row + ["", ""])[:2] for row in rows]
+                logger.success(f"→ Read rows {first_row}+ of the source sheet")
+
+        if rows is None:
+            rows = worksheet.get_all_values()
+            if len(rows) <= 1:
+                logger.warn("⚠️ No data (only header row found)")
+                return []
+            logger.success("→ Successfully read sheet values")
+            first_row, rows = 2, rows[1:]  # skip header
+
+        # remember the last dated row; it is the overlap row of the next read
+        for offset in range(len(rows) - 1, -1, -1):
+            if rows[offset] and rows[offset][0].strip():
+                _pending_source_state = {
+                    "sheet": source_sheet_key,
+                    "tab": tab,
+                    "last_row": first_row + offset,
+                    "last_date": rows[offset][0].strip(),
+                }
+                break
 
         results: List[Dict[str, Any]] = []
-        for row in rows[1:]:  # skip header
+        for row in rows:
             if len(row) < 2:
                 continue
-            date_str = row[0].strip()
             purchase_rate = row[1].strip()
-            effective_rate = None
-            if purchase_rate:
-                try:
-                    original = float(purchase_rate)
-                    effective_rate = round(original * 1.01, 2)
-                except ValueError:
-                    effective_rate = None
-
             results.append({
-                "Date": date_str,
+                "Date": row[0].strip(),
                 "Purchase Rate": purchase_rate or None,
-                "Effective Conversion Rate": effective_rate
+                "Effective Conversion Rate": _effective_rate(purchase_rate),
             })
-
         return results
 
     except Exception as e:
@@ -53,11 +121,69 @@ def read_and_calculate_bonasa_sheet_tab(logger: Logger) -> List[Dict[str, Any]]:
         return []
 
 
+def _parse_date(value: str):
+    try:
+        return datetime.strptime(value.strip(), "%d/%m/%Y").date()
+    except (AttributeError, ValueError):
+        return None
+
 
-def save_effective_conversion(logger: Logger, all_rows: List[Dict[str, Any]]) -> None:
-    """Ensure all dates are saved in the target sheet up to today."""
+def _same_cell(current: str, value: Any) -> bool:
+    """Compare a sheet cell with a value to write ("121.7" == 121.70, "" == None)."""
+    if value is None or value == "":
+        return current == ""
+    try:
+        return float(current) == float(value)
+    except ValueError:
+        return current == str(value).strip()
+
+
+def diff_effective_conversion(existing_rows: List[List[str]], all_rows: List[Dict[str, Any]], today: datetime = None):
+    """
+    Compare the rows to save with the BONASA tab (`existing_rows`, header included).
+    Returns (updates, appends):
+      - updates: [(sheet_row_number, new_row)] for dates whose values changed
+      - appends: [new_row] for dates not in the tab yet
+    Future dates are skipped; for a date given twice the last row wins.
+    """
+    today = (today or datetime.now()).date()
+
+    # date -> (sheet row number, cells); first occurrence wins like the old lookup
+    existing = {}
+    for row_number, row in enumerate(existing_rows[1:], start=2):  # header + 1-based index
+        row_date = _parse_date(row[0]) if row else None
+        if row_date is not None and row_date not in existing:
+            existing[row_date] = (row_number, row)
+
+    wanted = {}
+    for row in all_rows:
+        row_date = _parse_date(row["Date"])
+        if row_date is None or row_date > today:
+            # skip blank / invalid and future dates
+            continue
+        wanted[row_date] = [row["Date"], row["Purchase Rate"], row["Effective Conversion Rate"]]
+
+    updates, appends = [], []
+    for row_date, new_row in wanted.items():
+        if row_date not in existing:
+            appends.append(new_row)
+            continue
+        row_number, current = existing[row_date]
+        current = (list(current) + ["", "", ""])[:3]
+        if not all(_same_cell(cell, value) for cell, value in zip(current[1:], new_row[1:])):
+            updates.append((row_number, new_row))
+    return updates, appends
+
+
+def save_effective_conversion(logger: Logger, all_rows: List[Dict[str, Any]]) -> bool:
+    """
+    Ensure all dates are saved in the target sheet up to today.
+    Only changed rows are rewritten (one batch_update) and new dates are added
+    with one append_rows call. Returns False if saving failed.
+    """
     try:
         # Try to get worksheet, else create it
+        sh = get_spreadsheet()
         try:
             worksheet = sh.worksheet("BONASA")
         except Exception:
@@ -65,28 +191,25 @@ def save_effective_conversion(logger: Logger, all_rows: List[Dict[str, Any]]) ->
             worksheet.append_row(["DATE", "PURCHASE RATE", "EFFECTIVE CONVERSION RATE"])
             logger.info(f"→ Created worksheet BONASA")
 
-        existing_rows = worksheet.get_all_values()
-        existing_dates = [r[0] for r in existing_rows[1:]]  # skip header
-
-        today = datetime.now()
-
-        for row in all_rows:
-            row_date = datetime.strptime(row["Date"], "%d/%m/%Y")
-            if row_date > today:
-                # skip future dates
-                continue
-
-            new_row = [row["Date"], row["Purchase Rate"], row["Effective Conversion Rate"]]
-
-            if row["Date"] in existing_dates:
-                row_index = existing_dates.index(row["Date"]) + 2  # header + 1-based index
-                worksheet.update(f"A{row_index}:C{row_index}", [new_row])
-                logger.success(f"→ Updated row for {row['Date']}")
-            else:
-                worksheet.append_row(new_row, value_input_option="USER_ENTERED")
-                logger.success(f"→ Added new row for {row['Date']}")
-
-        logger.success("→ All dates processed and saved successfully")
+        updates, appends = diff_effective_conversion(worksheet.get_all_values(), all_rows)
+
+        if updates:
+            worksheet.batch_update([
+                {"range": f"A{row_number}:C{row_number}", "values": [new_row]}
+                for row_number, new_row in updates
+            ])
+            logger.success(f"→ Updated {len(updates)} rows: {', '.join(new_row[0] for _, new_row in updates)}")
+        if appends:
+            worksheet.append_rows(appends, value_input_option="USER_ENTERED")
+            logger.success(f"→ Added {len(appends)} new rows: {', '.join(new_row[0] for new_row in appends)}")
+
+        if updates or appends:
+            bonasa_index.invalidate()
+            logger.success("→ All dates processed and saved successfully")
+        else:
+            logger.info("→ BONASA tab already up to date")
+        return True
 
     except Exception as e:
         logger.error(f"❌ Error saving to sheet: {e}")
+        return False
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+
+class SingleFlightCache:
+    """
+    In-memory TTL cache that coalesces concurrent loads of the same key
+    (aget_or_load(), async callers on one event loop; sync callers go through
+    BinanceP2PService._run_sync). Only values accepted by `cacheable(value)`
+    are stored.
+    """
+
+    def __init__(self, ttl_seconds: float = 600):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._values = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._ainflight = {}  # key -> asyncio.Future
+
+    def _get_fresh(self, key):
+        entry = self._values.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    def _store(self, key, value, cacheable):
+        if cacheable is None or cacheable(value):
+            with self._lock:
+                self._values[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    async def aget_or_load(self, key, loader, cacheable=None):
+        """`loader` is a zero-argument callable returning an awaitable."""
+        with self._lock:
+            found, value = self._get_fresh(key)
+            if found:
+                self.hits += 1
+                return value
+
+            future = self._ainflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._ainflight[key] = future
+        try:
+            value = await loader()
+            self._store(key, value, cacheable)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an un-awaited future doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            self._ainflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._values),
+        }